@@ -1,33 +1,41 @@
 """API Routes for Space Entropy Generator"""
 
-from fastapi import APIRouter, HTTPException, Query, Path
-from fastapi.responses import JSONResponse, HTMLResponse
-from typing import Optional
-import base64
+from fastapi import APIRouter, Depends, HTTPException, Query, Path, Response
+from fastapi.responses import ORJSONResponse, HTMLResponse, StreamingResponse
+from typing import Literal, Optional
+import binascii
 import logging
 from pathlib import Path as FilePath
 
+from app.config import Settings, get_settings
 from app.entropy.pool import entropy_pool
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Web interface is static, so read it once at import instead of per request
+_INDEX_HTML_PATH = FilePath(__file__).parent.parent / "templates" / "index.html"
+try:
+    _INDEX_HTML: Optional[bytes] = _INDEX_HTML_PATH.read_bytes()
+except FileNotFoundError:
+    _INDEX_HTML = None
+
 
 @router.get("/", response_class=HTMLResponse)
 async def root():
     """Root endpoint - serve web interface"""
-    html_file = FilePath(__file__).parent.parent / "templates" / "index.html"
-    if html_file.exists():
-        return html_file.read_text()
+    if _INDEX_HTML is not None:
+        return HTMLResponse(_INDEX_HTML)
     else:
         # Fallback to JSON if HTML not found
-        return JSONResponse({
+        return ORJSONResponse({
             "name": "Space Entropy Generator",
             "version": "0.1.0",
             "description": "True Randomness as a Service using space imagery",
             "endpoints": {
                 "/random/{n}": "Get n random bytes (Base64 encoded)",
+                "/random/{n}/raw": "Stream n random bytes (application/octet-stream)",
                 "/health": "Health check",
                 "/stats": "Entropy pool statistics"
             }
@@ -35,7 +43,7 @@ async def root():
 
 
 @router.get("/health")
-async def health_check():
+async def health_check(settings: Settings = Depends(get_settings)):
     """
     Health check endpoint
     
@@ -46,7 +54,7 @@ async def health_check():
     return {
         "status": "healthy" if health.get('healthy', False) else "degraded",
         "service": "space-entropy-generator",
-        "version": "0.1.0",
+        "version": settings.app_version,
         "redis": health
     }
 
@@ -65,15 +73,19 @@ async def get_stats():
 @router.get("/random/{n}")
 async def get_random_bytes(
     n: int = Path(..., ge=1, le=10240, description="Number of random bytes to generate"),
+    output_format: Literal["base64", "hex", "raw"] = Query("base64", alias="format"),
 ):
     """
     Get n random bytes from the entropy pool
     
     Args:
         n: Number of bytes to return (1-10240)
+        output_format: Output encoding (`format` query parameter) -
+            base64 (default), hex, or raw bytes
         
     Returns:
-        Base64 encoded random bytes
+        Encoded random bytes in a JSON envelope, or raw
+        application/octet-stream when format=raw
     """
     # Validate input
     if n < 1 or n > 10240:
@@ -92,13 +104,19 @@ async def get_random_bytes(
                 detail="Entropy pool is empty. Please try again later."
             )
         
-        # Encode as base64 for safe transport
-        encoded = base64.b64encode(entropy).decode('utf-8')
+        if output_format == "raw":
+            return Response(content=entropy, media_type="application/octet-stream")
+        
+        # Encode for safe transport (C fast paths, no Python wrapper)
+        if output_format == "hex":
+            encoded = entropy.hex()
+        else:
+            encoded = binascii.b2a_base64(entropy, newline=False).decode('ascii')
         
         return {
             "bytes": encoded,
             "length": len(entropy),
-            "format": "base64"
+            "format": output_format
         }
     
     except ConnectionError as e:
@@ -108,6 +126,46 @@ async def get_random_bytes(
         )
 
 
+@router.get("/random/{n}/raw")
+async def get_random_bytes_raw(
+    n: int = Path(..., ge=1, le=10240, description="Number of random bytes to generate"),
+):
+    """
+    Stream n random bytes from the entropy pool without encoding
+    
+    Blocks are sent as soon as they are claimed from the pool.
+    
+    Args:
+        n: Number of bytes to return (1-10240)
+        
+    Returns:
+        Raw bytes as application/octet-stream
+    """
+    stream = entropy_pool.iter_entropy(n)
+    
+    # Pull the first block up front so an empty pool or a Redis outage
+    # still produces a proper 503 instead of a truncated 200
+    try:
+        first_chunk = await stream.__anext__()
+    except StopAsyncIteration:
+        raise HTTPException(
+            status_code=503,
+            detail="Entropy pool is empty. Please try again later."
+        )
+    except ConnectionError as e:
+        raise HTTPException(
+            status_code=503,
+            detail=f"Entropy service unavailable: {str(e)}"
+        )
+    
+    async def body():
+        yield first_chunk
+        async for chunk in stream:
+            yield chunk
+    
+    return StreamingResponse(body(), media_type="application/octet-stream")
+
+
 @router.get("/random")
 async def get_random_default():
     """
@@ -116,4 +174,4 @@ async def get_random_default():
     Returns:
         Base64 encoded random bytes
     """
-    return await get_random_bytes(256)
+    return await get_random_bytes(256, output_format="base64")
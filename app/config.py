@@ -1,6 +1,7 @@
 """Configuration management for the Space Entropy Generator"""
 
 from pydantic_settings import BaseSettings
+from functools import lru_cache
 from typing import Optional
 import os
 
@@ -24,6 +25,7 @@ class Settings(BaseSettings):
     redis_db: int = 0
     redis_password: Optional[str] = None
     redis_use_ssl: bool = False  # Set True for Azure Cache for Redis (port 6380)
+    redis_max_connections: int = 64  # connection pool size per worker
     
     # Entropy Pool Settings
     entropy_pool_size: int = 1024 * 1024  # 1 MB default pool size
@@ -37,6 +39,9 @@ class Settings(BaseSettings):
     image_storage_path: str = "/tmp/space_entropy_images"
     max_stored_images: int = 10
     
+    # Preprocessing Settings
+    noise_cache_path: Optional[str] = None  # on-disk cache of per-image noise maps (off if unset)
+    
     # Supported NASA SDO image types
     sdo_image_types: list = [
         "latest_1024_0193.jpg",  # 193 Angstrom
@@ -62,5 +67,21 @@ class Settings(BaseSettings):
         env_file_encoding = "utf-8"
 
 
-# Global settings instance
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """
+    Get the application settings
+    
+    Parsed from the environment / .env on first call and cached afterwards.
+    Use as a FastAPI dependency (Depends(get_settings)); tests can call
+    get_settings.cache_clear() to pick up a changed environment.
+    """
+    return Settings()
+
+
+def __getattr__(name: str):
+    # Keep `from app.config import settings` working, but only parse
+    # settings when they are first used rather than on import
+    if name == "settings":
+        return get_settings()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
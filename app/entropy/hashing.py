@@ -1,26 +1,55 @@
 """Cryptographic Hashing Module - Converts raw noise into high-quality entropy"""
 
 import hashlib
+import os
 import blake3
-from typing import List, Optional
-from datetime import datetime
-import struct
+import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, ClassVar, List, Optional, TypeVar
+import time
 import logging
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+R = TypeVar("R")
+
+# Inputs at least this large are hashed with BLAKE3's multi-threaded tree mode;
+# below it, thread spin-up costs more than it saves
+BLAKE3_MT_THRESHOLD = 128 * 1024
+
 
 class EntropyHasher:
     """Applies cryptographic hashing to raw entropy data"""
     
-    def __init__(self):
-        """Initialize hasher"""
+    # Chain seed used before the first block has been hashed
+    _ZERO32: ClassVar[bytes] = bytes(32)
+    
+    def __init__(self, max_workers: Optional[int] = None):
+        """
+        Initialize hasher
+        
+        Args:
+            max_workers: Threads used to hash chunks in parallel
+                (None uses the ThreadPoolExecutor default)
+        """
         self.previous_hash = None
+        
+        # BLAKE3 releases the GIL while hashing, so threads scale across cores
+        self._executor = ThreadPoolExecutor(max_workers=max_workers,
+                                            thread_name_prefix="entropy-hash")
+        
+        # Work is split into one batch per core: a 4 KB chunk hashes in about
+        # a microsecond, far less than the cost of a task submission
+        self._num_batches = max_workers or os.cpu_count() or 1
     
     def sha256_hash(self, data: bytes) -> bytes:
         """
         Apply SHA-256 hash
         
+        hashlib uses OpenSSL, which picks SHA-NI (or AVX2) block functions
+        at runtime when the CPU supports them.
+        
         Args:
             data: Input bytes
             
@@ -29,40 +58,38 @@ class EntropyHasher:
         """
         return hashlib.sha256(data).digest()
     
-    def blake3_hash(self, data: bytes) -> bytes:
+    def blake3_hash(self, data: bytes, max_threads: Optional[int] = None) -> bytes:
         """
         Apply BLAKE3 hash
         
-        BLAKE3 is faster and more secure than SHA-256
+        BLAKE3 is faster and more secure than SHA-256. The blake3 wheel ships
+        SSE4.1/AVX2/AVX-512 kernels, so SIMD is used automatically.
         
         Args:
             data: Input bytes
+            max_threads: BLAKE3 worker threads (None picks blake3.AUTO for
+                inputs of BLAKE3_MT_THRESHOLD bytes or more, else 1)
             
         Returns:
             32-byte BLAKE3 hash
         """
-        return blake3.blake3(data).digest()
+        if max_threads is None:
+            max_threads = blake3.blake3.AUTO if len(data) >= BLAKE3_MT_THRESHOLD else 1
+        return blake3.blake3(data, max_threads=max_threads).digest()
     
-    def hash_with_timestamp(self, data: bytes, timestamp: Optional[datetime] = None) -> bytes:
+    def hash_with_timestamp(self, data: bytes, timestamp_ns: Optional[int] = None) -> bytes:
         """
         Hash data with timestamp for anti-replay protection
         
         Args:
             data: Input bytes
-            timestamp: Timestamp to include (uses current time if None)
+            timestamp_ns: Timestamp in nanoseconds since epoch (uses current time if None)
             
         Returns:
             Hashed bytes including timestamp
         """
-        if timestamp is None:
-            timestamp = datetime.utcnow()
-        
-        # Convert timestamp to bytes (microseconds since epoch)
-        timestamp_int = int(timestamp.timestamp() * 1000000)
-        timestamp_bytes = struct.pack('>Q', timestamp_int)
-        
         # Combine data with timestamp
-        combined = data + timestamp_bytes
+        combined = data + self._timestamp_bytes(timestamp_ns)
         
         # Hash with BLAKE3 (faster)
         return self.blake3_hash(combined)
@@ -81,7 +108,7 @@ class EntropyHasher:
             Chained hash
         """
         if previous_hash is None:
-            previous_hash = self.previous_hash or b'\x00' * 32
+            previous_hash = self.previous_hash or self._ZERO32
         
         # Combine current data with previous hash
         combined = previous_hash + data
@@ -94,11 +121,66 @@ class EntropyHasher:
         
         return new_hash
     
+    def _timestamp_bytes(self, timestamp_ns: Optional[int] = None) -> bytes:
+        """Encode a timestamp (current time if None) as 8 big-endian bytes of microseconds"""
+        if timestamp_ns is None:
+            timestamp_ns = time.time_ns()
+        
+        # Convert timestamp to bytes (microseconds since epoch)
+        return (timestamp_ns // 1000).to_bytes(8, 'big')
+    
+    def _hash_block(self, digest: bytes) -> bytes:
+        """
+        Timestamp and chain one chunk digest in a single BLAKE3 pass
+        
+        Hashes previous_hash || digest || timestamp. Only this 72-byte step
+        is sequential; the chunk digests themselves are computed in parallel.
+        
+        Args:
+            digest: BLAKE3 digest of the raw chunk
+            
+        Returns:
+            32-byte chained hash
+        """
+        hasher = blake3.blake3(self.previous_hash or self._ZERO32)
+        hasher.update(digest)
+        hasher.update(self._timestamp_bytes())
+        
+        # Store for next chain
+        self.previous_hash = hasher.digest()
+        
+        return self.previous_hash
+    
+    def _chained_digests(self, raw_data: bytes, block_size: int) -> List[bytes]:
+        """
+        Whiten raw data chunk by chunk into one 32-byte digest per block
+        
+        Chunks are hashed in parallel on a thread pool, then chained to the
+        previous block and timestamped in order
+        """
+        # Split raw data into chunks
+        chunk_size = max(block_size, 1024)  # Ensure minimum chunk size
+        num_chunks = len(raw_data) // chunk_size
+        
+        if num_chunks == 0:
+            # If data is smaller than chunk_size, hash it directly
+            return [self.blake3_hash(raw_data)]
+        
+        # Slice a memoryview so chunks are handed to BLAKE3 without copying
+        view = memoryview(raw_data)
+        chunks = [view[i * chunk_size:(i + 1) * chunk_size] for i in range(num_chunks)]
+        
+        # Whiten each chunk independently (parallel)
+        digests = self._map_batched(self.blake3_hash, chunks)
+        
+        # Timestamp and chain with previous block (sequential, cheap)
+        return [self._hash_block(digest) for digest in digests]
+    
     def extract_entropy_blocks(self, raw_data: bytes, block_size: int = 4096) -> List[bytes]:
         """
         Extract entropy blocks from raw data using cryptographic hashing
         
-        Applies multiple hash rounds to whiten the data
+        One bytes object per row of extract_entropy_array.
         
         Args:
             raw_data: Raw noise bytes from image processing
@@ -107,40 +189,60 @@ class EntropyHasher:
         Returns:
             List of high-quality entropy blocks
         """
+        return [row.tobytes() for row in self.extract_entropy_array(raw_data, block_size)]
+    
+    def extract_entropy_array(self, raw_data: bytes, block_size: int = 4096) -> np.ndarray:
+        """
+        Extract entropy blocks as rows of one contiguous uint8 array
+        
+        Same blocks as extract_entropy_blocks, without a bytes object per
+        block; suits batch validation and row slicing.
+        
+        Args:
+            raw_data: Raw noise bytes from image processing
+            block_size: Desired size of each entropy block
+            
+        Returns:
+            (n_blocks, block_size) uint8 array
+        """
         if not raw_data:
-            return []
+            return np.empty((0, block_size), dtype=np.uint8)
         
-        blocks = []
+        digests = self._chained_digests(raw_data, block_size)
+        out = np.empty((len(digests), block_size), dtype=np.uint8)
         
-        # Split raw data into chunks
-        chunk_size = max(block_size, 1024)  # Ensure minimum chunk size
-        num_chunks = len(raw_data) // chunk_size
+        def fill(i: int) -> None:
+            out[i] = np.frombuffer(self._extend_to_size(digests[i], block_size), dtype=np.uint8)
         
-        if num_chunks == 0:
-            # If data is smaller than chunk_size, hash it directly
-            hashed = self.multi_round_hash(raw_data, rounds=3)
-            # Extend to block_size by repeated hashing
-            extended = self._extend_to_size(hashed, block_size)
-            blocks.append(extended)
-        else:
-            for i in range(num_chunks):
-                chunk = raw_data[i * chunk_size:(i + 1) * chunk_size]
-                
-                # Apply multiple hash rounds for whitening
-                hashed = self.multi_round_hash(chunk, rounds=3)
-                
-                # Add timestamp and chain with previous block
-                timestamped = self.hash_with_timestamp(hashed)
-                chained = self.hash_chain(timestamped)
-                
-                # Extend to desired block size
-                extended = self._extend_to_size(chained, block_size)
-                
-                blocks.append(extended)
-        
-        logger.info(f"✓ Extracted {len(blocks)} entropy blocks ({block_size} bytes each)")
-        
-        return blocks
+        # Extend each row in place (parallel)
+        self._map_batched(fill, list(range(len(digests))))
+        
+        logger.info(f"✓ Extracted {len(out)} entropy blocks ({block_size} bytes each)")
+        
+        return out
+    
+    def _map_batched(self, fn: Callable[[T], R], items: List[T]) -> List[R]:
+        """
+        Apply fn to every item on the thread pool, in order
+        
+        Items are split into contiguous batches (one per worker) so each task
+        does enough work to outweigh its scheduling cost.
+        
+        Args:
+            fn: Function to apply
+            items: Inputs
+            
+        Returns:
+            fn(item) for each item, in input order
+        """
+        num_batches = min(self._num_batches, len(items))
+        if num_batches <= 1:
+            return [fn(item) for item in items]
+        
+        step = -(-len(items) // num_batches)
+        batches = [items[i:i + step] for i in range(0, len(items), step)]
+        results = self._executor.map(lambda batch: [fn(item) for item in batch], batches)
+        return [out for batch in results for out in batch]
     
     def multi_round_hash(self, data: bytes, rounds: int = 3) -> bytes:
         """
@@ -213,16 +315,16 @@ class EntropyHasher:
                 extended = self._extend_to_size(data, max_len)
                 padded.append(extended)
             else:
-                padded.append(data[:max_len])
+                # Already max_len bytes long, no need to copy
+                padded.append(data)
         
-        # XOR combine all sources
-        result = bytearray(padded[0])
+        # XOR combine all sources (vectorized)
+        result = np.frombuffer(padded[0], dtype=np.uint8).copy()
         for data in padded[1:]:
-            for i in range(len(result)):
-                result[i] ^= data[i]
+            np.bitwise_xor(result, np.frombuffer(data, dtype=np.uint8), out=result)
         
         # Final hash for whitening
-        mixed = self.blake3_hash(bytes(result))
+        mixed = self.blake3_hash(result.tobytes())
         
         logger.debug(f"Mixed {len(data_sources)} entropy sources")
         
@@ -241,12 +343,23 @@ class EntropyHasher:
         Returns:
             List of processed entropy blocks
         """
+        return [row.tobytes() for row in self.process_image_noise_array(raw_noise, block_size)]
+    
+    def process_image_noise_array(self, raw_noise: bytes, block_size: int = 4096) -> np.ndarray:
+        """
+        process_image_noise, returning the blocks as rows of one uint8 array
+        
+        Args:
+            raw_noise: Raw noise extracted from image
+            block_size: Size of each output block
+            
+        Returns:
+            (n_blocks, block_size) uint8 array of processed entropy blocks
+        """
         logger.info(f"Processing {len(raw_noise):,} bytes of raw noise")
         
         # Extract entropy blocks with chaining and timestamps
-        blocks = self.extract_entropy_blocks(raw_noise, block_size)
-        
-        return blocks
+        return self.extract_entropy_array(raw_noise, block_size)
 
 
 # Global hasher instance
@@ -258,7 +371,7 @@ if __name__ == "__main__":
     import sys
     from pathlib import Path
     from app.ingestion import ingestion_manager
-    from app.preprocessing import preprocessor
+    from app.preprocessing import get_preprocessor
     from app.entropy.validation import validator
     
     print("Testing Entropy Hasher")
@@ -276,7 +389,7 @@ if __name__ == "__main__":
     # Extract noise from first image
     test_image = images[0]
     print(f"1. Extracting noise from: {Path(test_image).name}")
-    raw_noise = preprocessor.extract_noise(test_image)
+    raw_noise = get_preprocessor().extract_noise(test_image)
     print(f"   Raw noise: {len(raw_noise):,} bytes\n")
     
     # Process into entropy blocks
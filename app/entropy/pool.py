@@ -1,18 +1,25 @@
 """Entropy Pool Manager - Redis-backed secure entropy storage"""
 
 import redis
+import redis.asyncio as aioredis
 import asyncio
 import uuid
-import base64
 import json
-from typing import Optional, Dict, List
+from typing import AsyncIterator, Optional, Dict, List, Tuple
 from datetime import datetime, timezone
 import logging
 
-from app.config import settings
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
+# Errors raised by redis-py when the server is unreachable
+REDIS_UNAVAILABLE = (redis.ConnectionError, redis.TimeoutError)
+
+# Quality scores (0-1) are stored quantized to one byte: ample for ranking
+# and averaging, and a 1-3 digit field instead of a float string
+QUALITY_LEVELS = 255
+
 
 class EntropyPool:
     """Manages a pool of high-quality entropy using Redis"""
@@ -20,40 +27,105 @@ class EntropyPool:
     def __init__(self):
         """Initialize entropy pool"""
         self.redis_client = None
-        self.stats_key = "entropy:stats"
+        self.connection_pool = None
+        self.stats_key = "entropy:counters"
         self.pool_key_prefix = "entropy:block"
-        self.used_key_prefix = "entropy:used"
-        
-        # Connect to Redis
-        self._connect()
+        self.index_key = "entropy:index"
+    
+    def _data_key(self, block_id: str) -> str:
+        """Key holding a block's raw entropy bytes"""
+        return f"{self.pool_key_prefix}:data:{block_id}"
     
-    def _connect(self):
-        """Connect to Redis"""
+    def _meta_key(self, block_id: str) -> str:
+        """Key holding a block's metadata hash"""
+        return f"{self.pool_key_prefix}:meta:{block_id}"
+    
+    async def connect(self) -> bool:
+        """
+        Connect to Redis
+        
+        Must be called from a running event loop (e.g. the FastAPI lifespan).
+        
+        Returns:
+            True if the connection succeeded
+        """
+        settings = get_settings()
+        use_ssl = getattr(settings, 'redis_use_ssl', False)
+        pool = aioredis.ConnectionPool(
+            connection_class=aioredis.SSLConnection if use_ssl else aioredis.Connection,
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password if settings.redis_password else None,
+            decode_responses=False,  # We work with bytes
+            max_connections=settings.redis_max_connections,
+            socket_keepalive=True,
+            health_check_interval=30  # seconds; re-pings idle connections on checkout
+        )
+        client = aioredis.Redis(connection_pool=pool)
         try:
-            self.redis_client = redis.Redis(
-                host=settings.redis_host,
-                port=settings.redis_port,
-                db=settings.redis_db,
-                password=settings.redis_password if settings.redis_password else None,
-                decode_responses=False,  # We work with bytes
-                ssl=getattr(settings, 'redis_use_ssl', False)
-            )
             # Test connection
-            self.redis_client.ping()
-            logger.info(f"✓ Connected to Redis at {settings.redis_host}:{settings.redis_port}")
+            await client.ping()
+            self.redis_client = client
+            self.connection_pool = pool
+            logger.info(f"✓ Connected to Redis at {settings.redis_host}:{settings.redis_port} "
+                        f"(pool size: {settings.redis_max_connections})")
         except redis.ConnectionError as e:
             logger.error(f"✗ Failed to connect to Redis: {e}")
+            await client.aclose()
+            await pool.disconnect()
             self.redis_client = None
+        
+        return self.redis_client is not None
     
-    def is_connected(self) -> bool:
-        """Check if Redis is connected"""
-        if self.redis_client is None:
-            return False
+    def ping_sync(self, timeout: float = 2.0) -> bool:
+        """
+        Check that Redis is reachable without an event loop
+        
+        Lets scripts fail fast before starting asyncio; uses a throwaway
+        connection, not the pool.
+        
+        Args:
+            timeout: Connect/read timeout in seconds
+            
+        Returns:
+            True if Redis answered the ping
+        """
+        settings = get_settings()
+        client = redis.Redis(
+            host=settings.redis_host,
+            port=settings.redis_port,
+            db=settings.redis_db,
+            password=settings.redis_password if settings.redis_password else None,
+            ssl=getattr(settings, 'redis_use_ssl', False),
+            socket_connect_timeout=timeout,
+            socket_timeout=timeout
+        )
         try:
-            self.redis_client.ping()
-            return True
-        except:
+            return bool(client.ping())
+        except REDIS_UNAVAILABLE as e:
+            logger.error(f"✗ Redis ping failed: {e}")
             return False
+        finally:
+            client.close()
+    
+    async def close(self):
+        """Close the Redis connection"""
+        if self.redis_client is not None:
+            await self.redis_client.aclose()
+            self.redis_client = None
+        if self.connection_pool is not None:
+            await self.connection_pool.disconnect()
+            self.connection_pool = None
+    
+    def is_connected(self) -> bool:
+        """
+        Check if a Redis client is available
+        
+        This does not ping the server; dead connections are detected by the
+        pool's health checks and surface as errors on the actual command.
+        """
+        return self.redis_client is not None
     
     async def add_entropy(self, entropy_data: bytes, quality_score: float, 
                          source_info: Optional[Dict] = None) -> str:
@@ -68,37 +140,71 @@ class EntropyPool:
         Returns:
             Block ID (UUID)
         """
+        block_ids = await self.add_entropy_many([(entropy_data, quality_score, source_info)])
+        
+        logger.debug(f"Added entropy block {block_ids[0][:8]}... ({len(entropy_data)} bytes, quality: {quality_score:.3f})")
+        
+        return block_ids[0]
+    
+    async def add_entropy_many(self, blocks: List[Tuple[bytes, float, Optional[Dict]]]) -> List[str]:
+        """
+        Add several entropy blocks to the pool in one round-trip
+        
+        Args:
+            blocks: (entropy_data, quality_score, source_info) tuples
+            
+        Returns:
+            Block IDs (UUIDs), in the same order as `blocks`
+        """
         if not self.is_connected():
             raise ConnectionError("Redis not connected")
         
-        # Generate unique block ID
-        block_id = str(uuid.uuid4())
-        key = f"{self.pool_key_prefix}:{block_id}"
-        
-        # Create block metadata
-        block_data = {
-            'id': block_id,
-            'data': base64.b64encode(entropy_data).decode('utf-8'),
-            'quality_score': quality_score,
-            'size': len(entropy_data),
-            'timestamp': datetime.now(timezone.utc).isoformat(),
-            'source_info': source_info or {}
-        }
+        if not blocks:
+            return []
         
-        # Store in Redis with TTL
-        self.redis_client.setex(
-            key,
-            settings.entropy_ttl,
-            json.dumps(block_data)
-        )
+        block_ids = []
+        total_bytes = 0
+        timestamp = datetime.now(timezone.utc).isoformat()
+        ttl = get_settings().entropy_ttl
         
-        # Update statistics
-        await self._update_stats('blocks_added', 1)
-        await self._update_stats('total_bytes_added', len(entropy_data))
+        # Blocks from one image share a source_info dict: encode it once
+        encoded_sources: Dict[int, str] = {}
         
-        logger.debug(f"Added entropy block {block_id[:8]}... ({len(entropy_data)} bytes, quality: {quality_score:.3f})")
+        # Store in Redis with TTL and register in the block index,
+        # all in a single round-trip
+        try:
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                for entropy_data, quality_score, source_info in blocks:
+                    # Generate unique block ID
+                    block_id = str(uuid.uuid4())
+                    meta_key = self._meta_key(block_id)
+                    
+                    source_json = encoded_sources.get(id(source_info))
+                    if source_json is None:
+                        source_json = encoded_sources[id(source_info)] = json.dumps(source_info or {})
+                    
+                    # Create block metadata (raw bytes are stored separately)
+                    block_meta = {
+                        'q': round(quality_score * QUALITY_LEVELS),
+                        'size': len(entropy_data),
+                        'timestamp': timestamp,
+                        'source_info': source_json
+                    }
+                    
+                    pipe.setex(self._data_key(block_id), ttl, entropy_data)
+                    pipe.hset(meta_key, mapping=block_meta)
+                    pipe.expire(meta_key, ttl)
+                    
+                    block_ids.append(block_id)
+                    total_bytes += len(entropy_data)
+                
+                pipe.sadd(self.index_key, *block_ids)
+                self._update_stats(pipe, blocks_added=len(block_ids), total_bytes_added=total_bytes)
+                await pipe.execute()
+        except REDIS_UNAVAILABLE as e:
+            raise ConnectionError(f"Redis unavailable: {e}") from e
         
-        return block_id
+        return block_ids
     
     async def get_entropy(self, n_bytes: int) -> Optional[bytes]:
         """
@@ -119,67 +225,134 @@ class EntropyPool:
             return b''
         
         collected = bytearray()
-        blocks_used = []
-        
-        # Get available blocks
-        pattern = f"{self.pool_key_prefix}:*"
-        keys = self.redis_client.keys(pattern)
+        blocks_used = 0
         
-        if not keys:
-            logger.warning("Entropy pool is empty")
-            return None
+        # Stored blocks may not match the configured block size (it can
+        # change between runs), so claim one block first and size further
+        # claims from the smallest payload actually seen: claimed blocks are
+        # deleted, so over-claiming would throw entropy away
+        block_size = None
         
-        # Collect entropy from blocks
-        for key in keys:
-            if len(collected) >= n_bytes:
-                break
+        try:
+            # Claim blocks from the index until we have enough bytes
+            while len(collected) < n_bytes:
+                needed = n_bytes - len(collected)
+                count = -(-needed // block_size) if block_size else 1
+                payloads = await self._claim_blocks(count)
+                
+                if not payloads:
+                    break
+                
+                sizes = [len(p) for p in payloads if p]
+                if sizes:
+                    block_size = min(sizes + ([block_size] if block_size else []))
+                
+                for entropy_bytes in payloads:
+                    if len(collected) >= n_bytes:
+                        break
+                    
+                    # Block expired (TTL) but its ID was still indexed
+                    if not entropy_bytes:
+                        continue
+                    
+                    # Take what we need
+                    collected.extend(entropy_bytes[:n_bytes - len(collected)])
+                    blocks_used += 1
             
-            # Check if already used
-            block_id = key.decode('utf-8').split(':')[-1]
-            used_key = f"{self.used_key_prefix}:{block_id}"
+            if not collected:
+                logger.warning("Entropy pool is empty")
+                return None
             
-            if self.redis_client.exists(used_key):
-                continue  # Skip already used blocks
+            if len(collected) < n_bytes:
+                logger.warning(f"Could only collect {len(collected)}/{n_bytes} bytes from pool")
             
-            # Get block data
-            block_json = self.redis_client.get(key)
-            if not block_json:
-                continue
+            # Update statistics
+            async with self.redis_client.pipeline(transaction=False) as pipe:
+                self._update_stats(pipe, bytes_served=len(collected), requests_served=1)
+                await pipe.execute()
+        except REDIS_UNAVAILABLE as e:
+            raise ConnectionError(f"Redis unavailable: {e}") from e
+        
+        logger.info(f"Served {len(collected)} bytes from {blocks_used} blocks")
+        
+        return bytes(collected[:n_bytes])
+    
+    async def iter_entropy(self, n_bytes: int) -> AsyncIterator[bytes]:
+        """
+        Stream n random bytes from the pool, one block at a time
+        
+        Each block is claimed and yielded as soon as it is read, so callers
+        can start sending data before the whole request is collected. Stats
+        are updated as each block is claimed, so a client that disconnects
+        mid-stream is still accounted for.
+        
+        Args:
+            n_bytes: Number of bytes to retrieve
             
-            try:
-                block_data = json.loads(block_json)
-                entropy_bytes = base64.b64decode(block_data['data'])
-                
-                # Take what we need
-                needed = n_bytes - len(collected)
-                collected.extend(entropy_bytes[:needed])
+        Yields:
+            Chunks of random bytes (at most one block each)
+        """
+        if not self.is_connected():
+            raise ConnectionError("Redis not connected")
+        
+        served = 0
+        try:
+            while served < n_bytes:
+                payloads = await self._claim_blocks(1)
+                if not payloads:
+                    break
                 
-                # Mark as used (with same TTL as original block)
-                ttl = self.redis_client.ttl(key)
-                if ttl > 0:
-                    self.redis_client.setex(used_key, ttl, '1')
+                # Block expired (TTL) but its ID was still indexed
+                if not payloads[0]:
+                    continue
                 
-                # Delete the original block to prevent reuse
-                self.redis_client.delete(key)
+                chunk = payloads[0][:n_bytes - served]
                 
-                blocks_used.append(block_id)
+                # The block is gone from the pool whether or not the caller
+                # ends up sending it, so count it before yielding
+                async with self.redis_client.pipeline(transaction=False) as pipe:
+                    if served:
+                        self._update_stats(pipe, bytes_served=len(chunk))
+                    else:
+                        self._update_stats(pipe, bytes_served=len(chunk), requests_served=1)
+                    await pipe.execute()
                 
-            except (json.JSONDecodeError, KeyError) as e:
-                logger.error(f"Error reading block {block_id}: {e}")
-                continue
+                served += len(chunk)
+                yield chunk
+        except REDIS_UNAVAILABLE as e:
+            raise ConnectionError(f"Redis unavailable: {e}") from e
         
-        if len(collected) < n_bytes:
-            logger.warning(f"Could only collect {len(collected)}/{n_bytes} bytes from pool")
-            if len(collected) == 0:
-                return None
+        if served < n_bytes:
+            logger.warning(f"Could only stream {served}/{n_bytes} bytes from pool")
+    
+    async def _claim_blocks(self, count: int) -> List[Optional[bytes]]:
+        """
+        Atomically claim up to `count` blocks and remove them from the pool
+        
+        SPOP guarantees a block ID is handed out at most once, so a block
+        can never be served twice.
+        
+        Args:
+            count: Maximum number of blocks to claim
+            
+        Returns:
+            Block payloads (None for blocks that expired while indexed);
+            an empty list means the pool is empty
+        """
+        block_ids = await self.redis_client.spop(self.index_key, count)
+        if not block_ids:
+            return []
         
-        # Update statistics
-        await self._update_stats('bytes_served', len(collected))
-        await self._update_stats('requests_served', 1)
+        block_ids = [bid.decode('utf-8') for bid in block_ids]
+        data_keys = [self._data_key(bid) for bid in block_ids]
         
-        logger.info(f"Served {len(collected)} bytes from {len(blocks_used)} blocks")
+        # Read and delete the claimed blocks in one round-trip
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            pipe.mget(data_keys)
+            pipe.delete(*data_keys, *(self._meta_key(bid) for bid in block_ids))
+            payloads, _ = await pipe.execute()
         
-        return bytes(collected[:n_bytes])
+        return payloads
     
     async def get_stats(self) -> Dict:
         """
@@ -194,37 +367,63 @@ class EntropyPool:
                 'error': 'Redis not connected'
             }
         
+        try:
+            return await self._read_stats()
+        except REDIS_UNAVAILABLE as e:
+            logger.error(f"✗ Redis unavailable while reading stats: {e}")
+            return {
+                'status': 'disconnected',
+                'error': f'Redis unavailable: {e}'
+            }
+    
+    async def _read_stats(self) -> Dict:
+        """Read pool statistics from Redis"""
+        settings = get_settings()
+        
         # Count available blocks
-        pattern = f"{self.pool_key_prefix}:*"
-        available_keys = self.redis_client.keys(pattern)
-        num_blocks = len(available_keys)
+        num_blocks = await self.redis_client.scard(self.index_key)
         
         # Calculate total available bytes
         total_bytes = 0
         quality_scores = []
+        stale_ids = []
+        
+        # Sample up to 100 blocks for stats (metadata only, no payloads)
+        sample_ids = await self.redis_client.srandmember(self.index_key, 100) or []
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for bid in sample_ids:
+                pipe.hmget(self._meta_key(bid.decode('utf-8')), 'size', 'q', 'quality_score')
+            sample_meta = await pipe.execute() if sample_ids else []
+        
+        for block_id, (size, quality_u8, quality) in zip(sample_ids, sample_meta):
+            if size is None:
+                # Block expired via TTL; drop it from the index
+                stale_ids.append(block_id)
+                continue
+            try:
+                total_bytes += int(size)
+                if quality_u8 is not None:
+                    quality_scores.append(int(quality_u8) / QUALITY_LEVELS)
+                else:
+                    # Blocks stored before scores were quantized
+                    quality_scores.append(float(quality))
+            except (TypeError, ValueError):
+                pass
         
-        for key in available_keys[:100]:  # Sample first 100 blocks for stats
-            block_json = self.redis_client.get(key)
-            if block_json:
-                try:
-                    block_data = json.loads(block_json)
-                    total_bytes += block_data['size']
-                    quality_scores.append(block_data['quality_score'])
-                except:
-                    pass
+        if stale_ids:
+            await self.redis_client.srem(self.index_key, *stale_ids)
+            num_blocks = max(0, num_blocks - len(stale_ids))
         
         # Extrapolate if we sampled
-        if len(available_keys) > 100:
-            total_bytes = int(total_bytes * (num_blocks / 100))
+        sampled = len(sample_ids) - len(stale_ids)
+        if sampled and num_blocks > sampled:
+            total_bytes = int(total_bytes * (num_blocks / sampled))
         
         # Get accumulated stats
-        stats_data = self.redis_client.get(self.stats_key)
-        accumulated_stats = {}
-        if stats_data:
-            try:
-                accumulated_stats = json.loads(stats_data)
-            except:
-                pass
+        accumulated_stats = {
+            field.decode('utf-8'): value
+            for field, value in (await self.redis_client.hgetall(self.stats_key)).items()
+        }
         
         # Calculate average quality
         avg_quality = sum(quality_scores) / len(quality_scores) if quality_scores else 0.0
@@ -234,46 +433,38 @@ class EntropyPool:
             'available_blocks': num_blocks,
             'available_bytes': total_bytes,
             'average_quality': round(avg_quality, 3),
-            'blocks_added': accumulated_stats.get('blocks_added', 0),
-            'total_bytes_added': accumulated_stats.get('total_bytes_added', 0),
-            'bytes_served': accumulated_stats.get('bytes_served', 0),
-            'requests_served': accumulated_stats.get('requests_served', 0),
+            'blocks_added': int(accumulated_stats.get('blocks_added', 0)),
+            'total_bytes_added': int(accumulated_stats.get('total_bytes_added', 0)),
+            'bytes_served': int(accumulated_stats.get('bytes_served', 0)),
+            'requests_served': int(accumulated_stats.get('requests_served', 0)),
             'redis_host': settings.redis_host,
             'redis_port': settings.redis_port
         }
     
-    async def _update_stats(self, key: str, increment: int):
-        """Update accumulated statistics"""
-        if not self.is_connected():
-            return
-        
-        try:
-            stats_data = self.redis_client.get(self.stats_key)
-            stats = json.loads(stats_data) if stats_data else {}
-        except:
-            stats = {}
-        
-        stats[key] = stats.get(key, 0) + increment
-        stats['last_updated'] = datetime.now(timezone.utc).isoformat()
+    def _update_stats(self, pipe, **increments: int):
+        """
+        Queue atomic counter updates on a pipeline
         
-        self.redis_client.set(self.stats_key, json.dumps(stats))
+        Args:
+            pipe: Redis pipeline the HINCRBY commands are queued on
+            **increments: Counter name to increment amount
+        """
+        for field, amount in increments.items():
+            pipe.hincrby(self.stats_key, field, amount)
+        pipe.hset(self.stats_key, 'last_updated', datetime.now(timezone.utc).isoformat())
     
     async def clear_pool(self):
         """Clear all entropy from pool (for testing/maintenance)"""
         if not self.is_connected():
             return
         
-        # Delete all entropy blocks
-        pattern = f"{self.pool_key_prefix}:*"
-        keys = self.redis_client.keys(pattern)
-        if keys:
-            self.redis_client.delete(*keys)
-        
-        # Delete used markers
-        pattern = f"{self.used_key_prefix}:*"
-        keys = self.redis_client.keys(pattern)
-        if keys:
-            self.redis_client.delete(*keys)
+        # Delete all indexed entropy blocks, then the index itself
+        block_ids = [bid.decode('utf-8') for bid in await self.redis_client.smembers(self.index_key)]
+        if block_ids:
+            keys = [self._data_key(bid) for bid in block_ids]
+            keys.extend(self._meta_key(bid) for bid in block_ids)
+            await self.redis_client.delete(*keys)
+        await self.redis_client.delete(self.index_key)
         
         logger.info("Cleared entropy pool")
     
@@ -284,19 +475,21 @@ class EntropyPool:
         Returns:
             Health status dictionary
         """
+        # get_stats talks to Redis, so it doubles as the liveness probe
+        stats = await self.get_stats()
+        
         health = {
-            'redis_connected': self.is_connected(),
+            'redis_connected': stats['status'] == 'connected',
             'timestamp': datetime.now(timezone.utc).isoformat()
         }
         
         if health['redis_connected']:
-            stats = await self.get_stats()
             health['available_blocks'] = stats['available_blocks']
             health['available_bytes'] = stats['available_bytes']
             health['healthy'] = stats['available_blocks'] > 0
         else:
             health['healthy'] = False
-            health['error'] = 'Redis not connected'
+            health['error'] = stats['error']
         
         return health
 
@@ -310,7 +503,7 @@ if __name__ == "__main__":
     import sys
     from pathlib import Path
     from app.ingestion import ingestion_manager
-    from app.preprocessing import preprocessor
+    from app.preprocessing import get_preprocessor
     from app.entropy import hasher, validator
     
     async def test_pool():
@@ -318,7 +511,7 @@ if __name__ == "__main__":
         print("=" * 60)
         
         # Check connection
-        if not entropy_pool.is_connected():
+        if not await entropy_pool.connect():
             print("✗ Redis not connected. Start Redis with: redis-server")
             return 1
         
@@ -340,7 +533,7 @@ if __name__ == "__main__":
         print(f"1. Processing: {Path(test_image).name}")
         
         # Extract noise
-        raw_noise = preprocessor.extract_noise(test_image)
+        raw_noise = get_preprocessor().extract_noise(test_image)
         print(f"   Extracted {len(raw_noise):,} bytes of raw noise")
         
         # Hash into entropy blocks
@@ -349,16 +542,14 @@ if __name__ == "__main__":
         
         # Add blocks to pool
         print("2. Adding entropy to pool...")
-        added_count = 0
+        # One shared (read-only) source_info for every block of the image
+        source_info = {'source': Path(test_image).name}
+        valid = []
         for block in entropy_blocks:
             result = validator.validate(block)
             if result['passed']:
-                await entropy_pool.add_entropy(
-                    block,
-                    result['quality_score'],
-                    {'source': Path(test_image).name}
-                )
-                added_count += 1
+                valid.append((block, result['quality_score'], source_info))
+        added_count = len(await entropy_pool.add_entropy_many(valid))
         
         print(f"   Added {added_count} high-quality blocks to pool\n")
         
@@ -388,6 +579,7 @@ if __name__ == "__main__":
         for key, value in stats.items():
             print(f"   {key}: {value}")
         
+        await entropy_pool.close()
         return 0
     
     exit_code = asyncio.run(test_pool())
@@ -1,5 +1,12 @@
 """Ingestion module initialization"""
 
-from .fetch_images import ImageIngestionManager, ingestion_manager
+from .fetch_images import ImageIngestionManager, get_ingestion_manager
 
-__all__ = ['ImageIngestionManager', 'ingestion_manager']
+__all__ = ['ImageIngestionManager', 'get_ingestion_manager']
+
+
+def __getattr__(name: str):
+    # The shared manager is created lazily, see get_ingestion_manager()
+    if name == "ingestion_manager":
+        return get_ingestion_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
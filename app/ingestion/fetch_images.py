@@ -1,15 +1,19 @@
 """Image Ingestion Module - Fetches space images from NASA and other sources"""
 
 import asyncio
+import aiofiles
+import aiofiles.os
+import contextlib
 import httpx
 import os
 from datetime import datetime
+from functools import lru_cache
 from pathlib import Path
-from typing import List, Optional, Dict
+from typing import List, Optional, Dict, Tuple
 import hashlib
 import logging
 
-from app.config import settings
+from app.config import get_settings
 from typing import Any
 try:
     from app.storage import AzureBlobStorage
@@ -20,6 +24,9 @@ except Exception:
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Downloaded chunks are coalesced up to this size before each disk write
+WRITE_BUFFER_SIZE = 1024 * 1024
+
 
 class ImageSource:
     """Base class for image sources"""
@@ -27,8 +34,8 @@ class ImageSource:
     def __init__(self, name: str):
         self.name = name
     
-    async def fetch_image(self, url: str, save_path: str) -> Optional[str]:
-        """Fetch an image from URL and save it"""
+    async def fetch_image(self, url: str, save_path: str) -> Optional[Tuple[str, int, str]]:
+        """Fetch an image from URL and save it, returning (path, size, hash)"""
         raise NotImplementedError
 
 
@@ -37,40 +44,87 @@ class NASASDOSource(ImageSource):
     
     def __init__(self):
         super().__init__("NASA_SDO")
+        settings = get_settings()
         self.base_url = settings.nasa_sdo_base_url
         self.image_types = settings.sdo_image_types
+        self._client: Optional[httpx.AsyncClient] = None
     
-    async def fetch_image(self, url: str, save_path: str) -> Optional[str]:
+    def _get_client(self) -> httpx.AsyncClient:
+        """
+        Shared HTTP client, created on first use inside the event loop
+        
+        Keeping one client alive lets concurrent fetches reuse pooled
+        keep-alive connections instead of a new TCP+TLS handshake per image.
+        """
+        if self._client is None or self._client.is_closed:
+            self._client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(max_connections=16, max_keepalive_connections=16)
+            )
+        return self._client
+    
+    async def aclose(self):
+        """Close the shared HTTP client"""
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+    
+    async def fetch_image(self, url: str, save_path: str,
+                          client: Optional[httpx.AsyncClient] = None) -> Optional[Tuple[str, int, str]]:
         """
         Fetch a single image from NASA SDO
         
         Args:
             url: Full URL to the image
             save_path: Local path to save the image
+            client: HTTP client to use (defaults to the shared client)
             
         Returns:
-            Path to saved image or None if failed
+            (path, size in bytes, short SHA-256 hash) of the saved image,
+            or None if failed
         """
+        if client is None:
+            client = self._get_client()
+        
+        # Download next to the final path and rename it into place once
+        # complete, so listings never see a partially written image
+        part_path = save_path + ".part"
+        
         try:
-            async with httpx.AsyncClient(timeout=30.0) as client:
-                response = await client.get(url)
+            async with client.stream("GET", url) as response:
                 response.raise_for_status()
                 
-                # Save image
-                with open(save_path, 'wb') as f:
-                    f.write(response.content)
-                
-                # Calculate hash for verification
-                image_hash = hashlib.sha256(response.content).hexdigest()[:16]
-                
-                logger.info(f"✓ Fetched image from {url} (hash: {image_hash})")
-                return save_path
+                # Stream image to disk, hashing each chunk for verification.
+                # Chunks are buffered so each (threaded) write moves ~1 MB
+                hasher = hashlib.sha256()
+                size = 0
+                buffer = bytearray()
+                async with aiofiles.open(part_path, 'wb') as f:
+                    async for chunk in response.aiter_bytes(65536):
+                        hasher.update(chunk)
+                        size += len(chunk)
+                        buffer += chunk
+                        if len(buffer) >= WRITE_BUFFER_SIZE:
+                            await f.write(buffer)
+                            buffer.clear()
+                    if buffer:
+                        await f.write(buffer)
+            
+            await aiofiles.os.replace(part_path, save_path)
+            
+            image_hash = hasher.hexdigest()[:16]
+            
+            logger.info(f"✓ Fetched image from {url} (hash: {image_hash})")
+            return save_path, size, image_hash
                 
         except Exception as e:
             logger.error(f"✗ Failed to fetch image from {url}: {e}")
+            # Don't leave a partially written image behind
+            with contextlib.suppress(FileNotFoundError):
+                await aiofiles.os.remove(part_path)
             return None
     
-    async def fetch_latest_images(self, storage_path: str) -> List[str]:
+    async def fetch_latest_images(self, storage_path: str) -> List[Tuple[str, int, str]]:
         """
         Fetch all configured latest images from NASA SDO
         
@@ -78,13 +132,14 @@ class NASASDOSource(ImageSource):
             storage_path: Directory to store images
             
         Returns:
-            List of paths to successfully downloaded images
+            List of (path, size, hash) for successfully downloaded images
         """
         # Create storage directory if it doesn't exist
         Path(storage_path).mkdir(parents=True, exist_ok=True)
         
         downloaded_images = []
         tasks = []
+        client = self._get_client()
         
         # Create timestamp for this batch
         timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
@@ -97,13 +152,13 @@ class NASASDOSource(ImageSource):
             save_path = os.path.join(storage_path, filename)
             
             # Create async task for each image
-            tasks.append(self.fetch_image(url, save_path))
+            tasks.append(self.fetch_image(url, save_path, client))
         
         # Fetch all images concurrently
         results = await asyncio.gather(*tasks)
         
         # Filter out failed downloads
-        downloaded_images = [path for path in results if path is not None]
+        downloaded_images = [image for image in results if image is not None]
         
         logger.info(f"✓ Downloaded {len(downloaded_images)}/{len(self.image_types)} images")
         
@@ -114,11 +169,19 @@ class ImageIngestionManager:
     """Manages image ingestion from multiple sources"""
     
     def __init__(self):
+        settings = get_settings()
         self.storage_path = settings.image_storage_path
         self.max_stored_images = settings.max_stored_images
         self.sources: List[ImageSource] = []
         self.azure_blob = None
         
+        # (directory st_mtime_ns, image paths) from the last directory scan
+        self._listing_cache: Optional[Tuple[int, List[str]]] = None
+        
+        # Set whenever a fetch stores new images, so consumers can react
+        # immediately instead of polling
+        self.images_ready = asyncio.Event()
+        
         # Initialize sources
         self._initialize_sources()
         
@@ -153,48 +216,89 @@ class ImageIngestionManager:
             if isinstance(source, NASASDOSource):
                 images = await source.fetch_latest_images(self.storage_path)
                 
-                for image_path in images:
+                for image_path, size, image_hash in images:
+                    name = Path(image_path).name
+                    
+                    # Size comes from the download itself, no stat on the event loop
                     all_images.append({
                         'path': image_path,
+                        'name': name,
                         'source': source.name,
                         'timestamp': datetime.utcnow(),
-                        'size': os.path.getsize(image_path)
+                        'size': size,
+                        'hash': image_hash
                     })
 
                     # Optionally upload to Azure Blob
                     if self.azure_blob:
-                        blob_name = Path(image_path).name
-                        url = self.azure_blob.upload_file(image_path, blob_name=blob_name)
+                        url = self.azure_blob.upload_file(image_path, blob_name=name)
                         if url:
                             all_images[-1]['blob_url'] = url  # type: ignore[index]
         
         # Clean up old images if we exceed max storage
+        self._listing_cache = None
         self._cleanup_old_images()
         
+        if all_images:
+            self.images_ready.set()
+        
         return all_images
     
     def _cleanup_old_images(self):
         """Remove oldest images if we exceed max_stored_images"""
         try:
-            # Get all image files in storage
-            image_files = sorted(
-                Path(self.storage_path).glob("*.jpg"),
-                key=lambda x: x.stat().st_mtime,
-                reverse=True
-            )
+            # Get all image files in storage (one scandir pass, no Path objects)
+            with os.scandir(self.storage_path) as it:
+                image_files = [e for e in it if e.name.endswith(".jpg") and e.is_file()]
+            image_files.sort(key=lambda e: e.stat().st_mtime, reverse=True)
             
             # Remove excess images (keep newest ones)
             if len(image_files) > self.max_stored_images:
                 for old_file in image_files[self.max_stored_images:]:
-                    old_file.unlink()
+                    os.unlink(old_file.path)
                     logger.info(f"✓ Cleaned up old image: {old_file.name}")
+                self._listing_cache = None
                     
         except Exception as e:
             logger.error(f"✗ Error during cleanup: {e}")
     
+    async def aclose(self):
+        """Release resources held by the image sources (HTTP clients)"""
+        for source in self.sources:
+            if isinstance(source, NASASDOSource):
+                await source.aclose()
+    
+    async def wait_for_images(self, timeout: float) -> bool:
+        """
+        Wait until a fetch stores new images
+        
+        Args:
+            timeout: Maximum time to wait in seconds
+            
+        Returns:
+            True if new images arrived, False on timeout
+        """
+        try:
+            await asyncio.wait_for(self.images_ready.wait(), timeout)
+        except asyncio.TimeoutError:
+            return False
+        
+        self.images_ready.clear()
+        return True
+    
     def get_stored_images(self) -> List[str]:
         """Get list of currently stored images"""
-        return [str(f) for f in Path(self.storage_path).glob("*.jpg")]
+        # The directory mtime changes whenever a file is added or removed,
+        # so one stat call is enough to tell if the last scan is still valid
+        mtime_ns = os.stat(self.storage_path).st_mtime_ns
+        if self._listing_cache is not None and self._listing_cache[0] == mtime_ns:
+            return list(self._listing_cache[1])
+        
+        with os.scandir(self.storage_path) as it:
+            images = [e.path for e in it if e.name.endswith(".jpg") and e.is_file()]
+        
+        self._listing_cache = (mtime_ns, images)
+        return list(images)
     
     async def start_periodic_fetch(self, interval: int = None):
         """
@@ -204,7 +308,7 @@ class ImageIngestionManager:
             interval: Fetch interval in seconds (uses config default if None)
         """
         if interval is None:
-            interval = settings.image_fetch_interval
+            interval = get_settings().image_fetch_interval
         
         logger.info(f"✓ Starting periodic image fetch (interval: {interval}s)")
         
@@ -218,8 +322,23 @@ class ImageIngestionManager:
             await asyncio.sleep(interval)
 
 
-# Global instance
-ingestion_manager = ImageIngestionManager()
+@lru_cache(maxsize=1)
+def get_ingestion_manager() -> ImageIngestionManager:
+    """
+    Get the shared ingestion manager
+    
+    Created on first call rather than on import, since construction creates
+    the storage directory and probes the optional Azure Blob uploader.
+    """
+    return ImageIngestionManager()
+
+
+def __getattr__(name: str):
+    # Keep `from app.ingestion import ingestion_manager` working, but only
+    # construct the manager when it is first used
+    if name == "ingestion_manager":
+        return get_ingestion_manager()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 # Utility function for manual testing
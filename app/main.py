@@ -2,35 +2,85 @@
 
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
 import asyncio
 import logging
+from typing import List, Tuple
 
-from app.config import settings
+from app.config import get_settings
 from app.api.routes import router
-from app.ingestion import ingestion_manager
-from app.preprocessing import preprocessor
+from app.ingestion import get_ingestion_manager
+from app.preprocessing import get_preprocessor
 from app.entropy import hasher, validator
 from app.entropy.pool import entropy_pool
 
 # Configure logging
 logging.basicConfig(
-    level=logging.INFO if not settings.debug else logging.DEBUG,
+    level=logging.INFO if not get_settings().debug else logging.DEBUG,
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
 )
 logger = logging.getLogger(__name__)
 
 
+class SelectiveGZipMiddleware(GZipMiddleware):
+    """GZip middleware that leaves incompressible random-byte responses alone"""
+    
+    def __init__(self, app, minimum_size: int = 500, exclude_prefixes: tuple = ()):
+        super().__init__(app, minimum_size=minimum_size)
+        self.exclude_prefixes = exclude_prefixes
+    
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.exclude_prefixes):
+            await self.app(scope, receive, send)
+            return
+        await super().__call__(scope, receive, send)
+
+
+def _process_one_image(image_path: str) -> List[Tuple[bytes, float]]:
+    """
+    Extract, hash and validate entropy from one image (CPU-bound)
+    
+    Runs in a worker thread so the event loop keeps serving API requests.
+    
+    Returns:
+        List of (block, quality_score) for blocks that passed validation
+    """
+    # Extract noise (hashed straight from the extraction buffer, no bytes copy)
+    raw_noise = memoryview(get_preprocessor().extract_noise_array(image_path))
+    
+    # Hash into entropy blocks, as rows of one contiguous array
+    blocks_2d = hasher.process_image_noise_array(raw_noise, get_settings().entropy_block_size)
+    if not len(blocks_2d):
+        return []
+    
+    # Validate all blocks at once
+    results = validator.batch_validate_contiguous(blocks_2d)
+    
+    return [
+        (block.tobytes(), result['quality_score'])
+        for block, result in zip(blocks_2d, results)
+        if result['passed']
+    ]
+
+
 async def generate_entropy_continuously():
     """
     Background task: continuously generate and store entropy
     
+    Runs entirely inside the lifespan, so API requests only ever read from
+    the pool and never wait on image fetching or processing. It wakes up as
+    soon as the ingestion task stores new images, or every 30 seconds.
+    
     This task:
     1. Gets stored images from ingestion manager
     2. Extracts noise from each image
     3. Hashes noise into entropy blocks
     4. Validates and adds high-quality blocks to pool
     """
+    ingestion_manager = get_ingestion_manager()
+    
     while True:
         try:
             # Check if pool needs refilling
@@ -47,23 +97,14 @@ async def generate_entropy_continuously():
                 if images:
                     # Process each image
                     for image_path in images:
-                        # Extract noise
-                        raw_noise = preprocessor.extract_noise(image_path)
+                        # Extract, hash and validate off the event loop
+                        results = await asyncio.to_thread(_process_one_image, image_path)
                         
-                        # Hash into entropy blocks
-                        entropy_blocks = hasher.process_image_noise(raw_noise, block_size=4096)
+                        # Add to pool in one batch
+                        source_info = {'source': 'space_image', 'image': image_path}
+                        valid = [(block, score, source_info) for block, score in results]
                         
-                        # Validate and add to pool
-                        added = 0
-                        for block in entropy_blocks:
-                            result = validator.validate(block)
-                            if result['passed']:
-                                await entropy_pool.add_entropy(
-                                    block,
-                                    result['quality_score'],
-                                    {'source': 'space_image', 'image': image_path}
-                                )
-                                added += 1
+                        added = len(await entropy_pool.add_entropy_many(valid))
                         
                         logger.info(f"Added {added} blocks from {image_path}")
                         
@@ -73,8 +114,8 @@ async def generate_entropy_continuously():
                 else:
                     logger.warning("No images available for entropy generation")
             
-            # Wait before next check
-            await asyncio.sleep(30)  # Check every 30 seconds
+            # Wait for freshly fetched images, or re-check every 30 seconds
+            await ingestion_manager.wait_for_images(timeout=30)
             
         except Exception as e:
             logger.error(f"Error in entropy generation: {e}", exc_info=True)
@@ -88,8 +129,15 @@ async def lifespan(app: FastAPI):
     Handles startup and shutdown events
     """
     # Startup
+    settings = get_settings()
     logger.info("🚀 Starting Space Entropy Generator...")
     
+    # Connect to Redis (the async client needs a running event loop)
+    await entropy_pool.connect()
+    
+    # Create the ingestion manager (storage directory, optional Azure uploader)
+    ingestion_manager = get_ingestion_manager()
+    
     # Start periodic image fetching in background
     fetch_task = asyncio.create_task(
         ingestion_manager.start_periodic_fetch()
@@ -118,15 +166,18 @@ async def lifespan(app: FastAPI):
         await entropy_task
     except asyncio.CancelledError:
         pass
+    await ingestion_manager.aclose()
+    await entropy_pool.close()
     logger.info("✓ Shutdown complete")
 
 
 # Create FastAPI application
 app = FastAPI(
-    title=settings.app_name,
-    version=settings.app_version,
+    title=get_settings().app_name,
+    version=get_settings().app_version,
     description="Generate cryptographically secure random numbers from space imagery",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # orjson is much faster than stdlib json
 )
 
 # Configure CORS
@@ -138,6 +189,14 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Compress JSON responses such as /stats and /health. Random bytes don't
+# compress, so /random responses skip the middleware entirely.
+app.add_middleware(
+    SelectiveGZipMiddleware,
+    minimum_size=512,
+    exclude_prefixes=("/api/v1/random",),
+)
+
 # Include API routes
 app.include_router(router, prefix="/api/v1", tags=["entropy"])
 
@@ -145,6 +204,7 @@ app.include_router(router, prefix="/api/v1", tags=["entropy"])
 @app.get("/")
 async def root():
     """Root endpoint"""
+    settings = get_settings()
     return {
         "service": settings.app_name,
         "version": settings.app_version,
@@ -162,6 +222,7 @@ async def ping():
 
 if __name__ == "__main__":
     import uvicorn
+    settings = get_settings()
     uvicorn.run(
         "app.main:app",
         host=settings.api_host,
@@ -0,0 +1,8 @@
+"""Shared guards for Numba parallel kernels"""
+
+import threading
+
+# Numba's parallel kernels already use every core, and its default workqueue
+# threading layer is process-wide and must not be entered from several
+# threads at once; every parallel=True kernel call takes this lock
+PARALLEL_KERNEL_LOCK = threading.Lock()
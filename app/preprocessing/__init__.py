@@ -1,6 +1,12 @@
 """Preprocessing module - Noise extraction from space images"""
 
-from .noise_extraction import ImagePreprocessor, preprocessor
+from .noise_extraction import ImagePreprocessor, get_preprocessor
 
-__all__ = ['ImagePreprocessor', 'preprocessor']
+__all__ = ['ImagePreprocessor', 'get_preprocessor']
 
+
+def __getattr__(name: str):
+    # The shared preprocessor is created lazily, see get_preprocessor()
+    if name == "preprocessor":
+        return get_preprocessor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
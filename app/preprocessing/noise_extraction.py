@@ -1,27 +1,215 @@
 """Image Preprocessing Module - Extract entropy-rich noise from space images"""
 
+import blake3
 import cv2
 import numpy as np
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 from typing import List, Tuple, Optional
 import hashlib
+import os
+import threading
 import time
 import logging
 from pathlib import Path
 
+from app.config import get_settings
+from app.parallel import PARALLEL_KERNEL_LOCK
+
 logger = logging.getLogger(__name__)
 
+try:
+    from numba import njit, prange
+    NUMBA_AVAILABLE = True
+except ImportError:  # optional - falls back to OpenCV + NumPy
+    NUMBA_AVAILABLE = False
+    prange = range
+
+try:
+    from scipy import fft as _fft
+    # SciPy's pocketfft can split a 2D transform across threads
+    _FFT_KWARGS = {'workers': -1}
+except ImportError:  # optional - falls back to numpy.fft (single-threaded)
+    _fft = np.fft
+    _FFT_KWARGS = {}
+
+@lru_cache(maxsize=8)
+def _high_pass_mask(rows: int, cols: int, cutoff_ratio: float) -> np.ndarray:
+    """
+    Read-only high-pass mask for an rfft2 spectrum of a rows x cols image
+    
+    Built directly in unshifted FFT coordinates (1 for high freq, 0 for low
+    freq), so no fftshift/ifftshift passes are needed.
+    """
+    # Calculate radius for high-pass filter
+    crow, ccol = rows // 2, cols // 2
+    radius = int(min(crow, ccol) * (1 - cutoff_ratio))
+    
+    fy = np.fft.fftfreq(rows, 1 / rows)[:, None]
+    fx = np.fft.rfftfreq(cols, 1 / cols)[None, :]
+    mask = fy**2 + fx**2 > radius**2
+    mask.setflags(write=False)
+    return mask
+
+
+def _laplacian_combined(image, y, x, rows, cols):
+    """|Laplacian| + 0.3 * pixel at (y, x), with reflect-101 borders"""
+    # Reflect-101 borders: index -1 -> 1, index n -> n - 2
+    yn = y - 1 if y > 0 else min(1, rows - 1)
+    ys = y + 1 if y < rows - 1 else max(rows - 2, 0)
+    xw = x - 1 if x > 0 else min(1, cols - 1)
+    xe = x + 1 if x < cols - 1 else max(cols - 2, 0)
+    c = np.int32(image[y, x])
+    lap = (np.int32(image[yn, x]) + np.int32(image[ys, x]) +
+           np.int32(image[y, xw]) + np.int32(image[y, xe]) - 4 * c)
+    return np.float64(abs(lap)) + np.float64(c) * 0.3
+
+
+def _laplacian_fused_u8(image, out):
+    """
+    |Laplacian| + 0.3 * image, normalized to 0-255, in two passes
+    
+    Matches cv2.Laplacian (3x3, BORDER_REFLECT_101) followed by the float64
+    combine/normalize. The first pass only finds the min/max; the second
+    recomputes each value (cheaper than storing it) and writes the uint8
+    result, so no intermediate image is allocated.
+    """
+    rows, cols = image.shape
+    row_min = np.empty(rows, dtype=np.float64)
+    row_max = np.empty(rows, dtype=np.float64)
+    
+    for y in prange(rows):
+        lo = np.inf
+        hi = -np.inf
+        for x in range(cols):
+            v = _laplacian_combined(image, y, x, rows, cols)
+            lo = min(lo, v)
+            hi = max(hi, v)
+        row_min[y] = lo
+        row_max[y] = hi
+    
+    lo = row_min.min()
+    hi = row_max.max()
+    for y in prange(rows):
+        for x in range(cols):
+            v = _laplacian_combined(image, y, x, rows, cols)
+            if hi > lo:
+                out[y, x] = np.uint8((v - lo) / (hi - lo) * 255)
+            else:
+                out[y, x] = np.uint8(v)
+    return out
+
+
+def _laplacian_fused_u8_batch(images, out):
+    """_laplacian_fused_u8 for a (k, H, W) stack, each image normalized on its own"""
+    n, rows, cols = images.shape
+    for i in prange(n):
+        image = images[i]
+        lo = np.inf
+        hi = -np.inf
+        for y in range(rows):
+            for x in range(cols):
+                v = _laplacian_combined(image, y, x, rows, cols)
+                lo = min(lo, v)
+                hi = max(hi, v)
+        for y in range(rows):
+            for x in range(cols):
+                v = _laplacian_combined(image, y, x, rows, cols)
+                if hi > lo:
+                    out[i, y, x] = np.uint8((v - lo) / (hi - lo) * 255)
+                else:
+                    out[i, y, x] = np.uint8(v)
+    return out
+
+
+def _gradient_magnitude_u8(grad_x, grad_y, out):
+    """
+    sqrt(gx^2 + gy^2) normalized to 0-255 without a magnitude buffer
+    
+    The first pass only finds the maximum; the second recomputes each
+    magnitude (cheaper than storing it) and writes the uint8 result.
+    """
+    rows, cols = grad_x.shape
+    row_max = np.zeros(rows, dtype=np.float64)
+    for y in prange(rows):
+        hi = 0.0
+        for x in range(cols):
+            gx = np.float64(grad_x[y, x])
+            gy = np.float64(grad_y[y, x])
+            hi = max(hi, np.sqrt(gx * gx + gy * gy))
+        row_max[y] = hi
+    
+    m = row_max.max()
+    for y in prange(rows):
+        for x in range(cols):
+            if m > 0:
+                gx = np.float64(grad_x[y, x])
+                gy = np.float64(grad_y[y, x])
+                out[y, x] = np.uint8(np.sqrt(gx * gx + gy * gy) / m * 255)
+            else:
+                out[y, x] = 0
+    return out
+
+
+def _abs_normalize_u8(values, out):
+    """
+    |values| normalized to 0-255 in two row-parallel passes
+    
+    Replaces np.abs, the division and the scaling, each of which streams a
+    full float64 image through memory, with one max pass and one write pass.
+    """
+    rows, cols = values.shape
+    row_max = np.zeros(rows, dtype=np.float64)
+    for y in prange(rows):
+        hi = 0.0
+        for x in range(cols):
+            hi = max(hi, abs(values[y, x]))
+        row_max[y] = hi
+    
+    m = row_max.max()
+    for y in prange(rows):
+        for x in range(cols):
+            if m > 0:
+                out[y, x] = np.uint8(abs(values[y, x]) / m * 255)
+            else:
+                out[y, x] = np.uint8(abs(values[y, x]))
+    return out
+
+
+if NUMBA_AVAILABLE:
+    _laplacian_combined = njit(inline='always', cache=True)(_laplacian_combined)
+    _laplacian_fused_u8 = njit(parallel=True, cache=True)(_laplacian_fused_u8)
+    _laplacian_fused_u8_batch = njit(parallel=True, cache=True)(_laplacian_fused_u8_batch)
+    _gradient_magnitude_u8 = njit(parallel=True, cache=True)(_gradient_magnitude_u8)
+    _abs_normalize_u8 = njit(parallel=True, cache=True)(_abs_normalize_u8)
+    
+    # Compile at import instead of on the first processed image
+    _warmup = np.arange(16, dtype=np.uint8).reshape(4, 4)
+    _laplacian_fused_u8(_warmup, np.empty((4, 4), dtype=np.uint8))
+    _laplacian_fused_u8_batch(_warmup.reshape(1, 4, 4), np.empty((1, 4, 4), dtype=np.uint8))
+    _gradient_magnitude_u8(_warmup.astype(np.int16), _warmup.astype(np.int16), np.empty((4, 4), dtype=np.uint8))
+    _abs_normalize_u8(_warmup.astype(np.float64), np.empty((4, 4), dtype=np.uint8))
+
 
 class ImagePreprocessor:
     """Extracts high-entropy noise from images"""
     
-    def __init__(self, block_size: int = 4096):
+    def __init__(self, block_size: int = 4096, cache_path: Optional[str] = None):
         """
         Initialize preprocessor
         
         Args:
             block_size: Target size for extracted entropy blocks (bytes)
+            cache_path: Directory for cached per-image noise maps
+                (None disables the cache)
         """
         self.block_size = block_size
+        self.cache_path = cache_path
+        
+        # OpenCV and NumPy's FFT release the GIL, so the per-image methods
+        # can run side by side
+        self._executor = ThreadPoolExecutor(max_workers=min(5, os.cpu_count() or 1),
+                                            thread_name_prefix="noise-extract")
     
     def load_image(self, image_path: str) -> Optional[np.ndarray]:
         """
@@ -71,23 +259,52 @@ class ImagePreprocessor:
         Returns:
             Noise array
         """
+        if NUMBA_AVAILABLE and image.dtype == np.uint8 and image.ndim == 2 and image.size:
+            # Filter, combine and normalize in one kernel, no float64 temporaries
+            out = np.empty(image.shape, dtype=np.uint8)
+            with PARALLEL_KERNEL_LOCK:
+                return _laplacian_fused_u8(image, out)
+        
         # Apply Laplacian filter to detect edges
-        laplacian = cv2.Laplacian(image, cv2.CV_64F)
+        # (for uint8 input the 3x3 stencil fits in int16 exactly)
+        depth = cv2.CV_16S if image.dtype == np.uint8 else cv2.CV_64F
+        laplacian = cv2.Laplacian(image, depth)
         
         # Take absolute values
         noise = np.abs(laplacian)
         
         # Add original image to preserve some structure
-        # This prevents too many zeros
-        combined = noise + image.astype(np.float64) * 0.3
+        # This prevents too many zeros (one float64 buffer, updated in place)
+        combined = image * 0.3
+        combined += noise
         
         # Normalize to 0-255
-        if combined.max() > combined.min():
-            noise = ((combined - combined.min()) / (combined.max() - combined.min()) * 255).astype(np.uint8)
-        else:
-            noise = combined.astype(np.uint8)
+        lo, hi = combined.min(), combined.max()
+        if hi > lo:
+            combined -= lo
+            combined /= hi - lo
+            combined *= 255
+        
+        return combined.astype(np.uint8)
+    
+    def extract_laplacian_noise_batch(self, images: np.ndarray) -> np.ndarray:
+        """
+        Extract Laplacian noise from a stack of equally sized grayscale images
         
-        return noise
+        Args:
+            images: (k, H, W) array of grayscale images
+            
+        Returns:
+            (k, H, W) uint8 noise, each image normalized independently
+        """
+        if NUMBA_AVAILABLE and images.dtype == np.uint8 and images.ndim == 3 and images.size:
+            # One kernel call across the whole stack instead of k dispatches
+            out = np.empty(images.shape, dtype=np.uint8)
+            with PARALLEL_KERNEL_LOCK:
+                return _laplacian_fused_u8_batch(images, out)
+        
+        return np.array([self.extract_laplacian_noise(image) for image in images],
+                        dtype=np.uint8).reshape(images.shape)
     
     def extract_fft_high_freq(self, image: np.ndarray, cutoff_ratio: float = 0.7) -> np.ndarray:
         """
@@ -102,38 +319,29 @@ class ImagePreprocessor:
         Returns:
             High-frequency component image
         """
-        # Apply 2D FFT
-        f_transform = np.fft.fft2(image)
-        f_shift = np.fft.fftshift(f_transform)
-        
-        # Create high-pass filter (keep outer frequencies)
+        # Apply 2D FFT (real input: half spectrum is enough)
         rows, cols = image.shape
-        crow, ccol = rows // 2, cols // 2
-        
-        # Calculate radius for high-pass filter
-        radius = int(min(crow, ccol) * (1 - cutoff_ratio))
-        
-        # Create mask (1 for high freq, 0 for low freq)
-        mask = np.ones((rows, cols), dtype=np.uint8)
-        y, x = np.ogrid[:rows, :cols]
-        mask_area = (x - ccol)**2 + (y - crow)**2 <= radius**2
-        mask[mask_area] = 0
+        f_transform = _fft.rfft2(image, **_FFT_KWARGS)
         
-        # Apply mask
-        f_shift_filtered = f_shift * mask
+        # Apply high-pass mask (cached: images from a source share one shape)
+        f_transform *= _high_pass_mask(rows, cols, cutoff_ratio)
         
         # Inverse FFT
-        f_ishift = np.fft.ifftshift(f_shift_filtered)
-        img_back = np.fft.ifft2(f_ishift)
-        img_back = np.abs(img_back)
+        img_back = _fft.irfft2(f_transform, s=image.shape, **_FFT_KWARGS)
         
-        # Normalize to 0-255
-        if img_back.max() > 0:
-            img_back = (img_back / img_back.max() * 255).astype(np.uint8)
-        else:
-            img_back = img_back.astype(np.uint8)
+        # Absolute value and normalize to 0-255
+        if NUMBA_AVAILABLE:
+            out = np.empty(img_back.shape, dtype=np.uint8)
+            with PARALLEL_KERNEL_LOCK:
+                return _abs_normalize_u8(img_back, out)
+        
+        np.abs(img_back, out=img_back)
+        max_val = img_back.max()
+        if max_val > 0:
+            img_back /= max_val
+            img_back *= 255
         
-        return img_back
+        return img_back.astype(np.uint8)
     
     def extract_pixel_differences(self, image: np.ndarray) -> np.ndarray:
         """
@@ -148,11 +356,21 @@ class ImagePreprocessor:
             Difference array
         """
         # Calculate gradients in X and Y directions
-        grad_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
-        grad_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
+        if image.dtype == np.uint8:
+            # Both 3x3 Sobel gradients in one SIMD pass, as exact int16
+            grad_x, grad_y = cv2.spatialGradient(image, ksize=3, borderType=cv2.BORDER_DEFAULT)
+        else:
+            grad_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
+            grad_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
+        
+        if NUMBA_AVAILABLE:
+            # Combine and normalize in one kernel, no float64 temporaries
+            out = np.empty(grad_x.shape, dtype=np.uint8)
+            with PARALLEL_KERNEL_LOCK:
+                return _gradient_magnitude_u8(grad_x, grad_y, out)
         
         # Combine gradients
-        gradient = np.sqrt(grad_x**2 + grad_y**2)
+        gradient = np.sqrt(np.square(grad_x, dtype=np.float64) + np.square(grad_y, dtype=np.float64))
         
         # Normalize to 0-255
         if gradient.max() > 0:
@@ -163,7 +381,7 @@ class ImagePreprocessor:
         return gradient
     
     def sample_random_regions(self, image: np.ndarray, num_regions: int = 10, 
-                             region_size: Tuple[int, int] = (64, 64)) -> List[np.ndarray]:
+                             region_size: Tuple[int, int] = (64, 64)) -> np.ndarray:
         """
         Sample random regions from image (non-deterministic)
         
@@ -175,28 +393,37 @@ class ImagePreprocessor:
             region_size: Size of each region (height, width)
             
         Returns:
-            List of image regions
+            (k, h, w) array of sampled regions ((k, h, w, channels) for
+            color images), a copy rather than views into the image. k is
+            num_regions, or 0 if the image is no larger than a region.
         """
-        if image.size == 0:
-            return []
-        
         height, width = image.shape[:2]
         reg_h, reg_w = region_size
+        empty = np.empty((0, reg_h, reg_w) + image.shape[2:], dtype=image.dtype)
+        if image.size == 0:
+            return empty
         
         # Non-deterministic seed based on time and image content
-        seed = abs(int(time.time() * 1000000) ^ hash(image.tobytes()[:1000]))
+        # (only the leading 1000 bytes are copied, not the whole image)
+        head = image.flat[:-(-1000 // image.itemsize)].tobytes()[:1000]
+        seed = abs(int(time.time() * 1000000) ^ hash(head))
         rng = np.random.default_rng(seed)
         
-        regions = []
-        for _ in range(num_regions):
-            # Random position
-            if height > reg_h and width > reg_w:
-                y = rng.integers(0, height - reg_h)
-                x = rng.integers(0, width - reg_w)
-                region = image[y:y+reg_h, x:x+reg_w]
-                regions.append(region)
+        if not (height > reg_h and width > reg_w):
+            return empty
+        
+        # Random positions, all drawn at once
+        ys = rng.integers(0, height - reg_h, size=num_regions)
+        xs = rng.integers(0, width - reg_w, size=num_regions)
         
-        return regions
+        # Gather every region with one fancy index into the window view
+        windows = np.lib.stride_tricks.sliding_window_view(image, region_size, axis=(0, 1))
+        regions = windows[ys, xs]
+        if image.ndim > 2:
+            # Window axes come last: (k, channels, h, w) -> (k, h, w, channels)
+            regions = np.moveaxis(regions, 1, -1)
+        
+        return np.ascontiguousarray(regions)
     
     def separate_rgb_channels(self, image: np.ndarray) -> List[np.ndarray]:
         """
@@ -208,19 +435,21 @@ class ImagePreprocessor:
             image: Color image (BGR format from OpenCV)
             
         Returns:
-            List of [blue, green, red] channels
+            List of contiguous [blue, green, red] channels
         """
         if len(image.shape) == 2:
             # Grayscale, return as single channel
             return [image]
         
-        return [image[:, :, i] for i in range(image.shape[2])]
+        # cv2.split deinterleaves in one pass and returns contiguous planes,
+        # so downstream OpenCV/Numba calls don't copy strided views
+        return list(cv2.split(image))
     
     def extract_noise(self, image_path: str) -> bytes:
         """
         Extract high-entropy noise from an image using multiple methods
         
-        This is the main entry point that combines all extraction techniques
+        A bytes copy of extract_noise_array, which implements the extraction
         
         Args:
             image_path: Path to image file
@@ -228,56 +457,143 @@ class ImagePreprocessor:
         Returns:
             Raw bytes with high entropy content
         """
-        # Load image
-        image = self.load_image(image_path)
-        if image is None:
-            logger.error(f"Cannot extract noise from {image_path}")
-            return bytes()
-        
-        logger.info(f"Processing image: {Path(image_path).name}")
-        
-        collected_bytes = bytearray()
+        return self.extract_noise_array(image_path).tobytes()
+    
+    def extract_noise_array(self, image_path: str) -> np.ndarray:
+        """
+        extract_noise, returning the noise buffer itself instead of a copy
         
-        # Method 1: Process each RGB channel separately
-        channels = self.separate_rgb_channels(image)
-        for i, channel in enumerate(channels):
-            # Convert to grayscale if needed
-            if len(channel.shape) > 2:
-                channel = self.convert_to_grayscale(channel)
+        Args:
+            image_path: Path to image file
             
-            # Extract Laplacian noise
-            laplacian = self.extract_laplacian_noise(channel)
-            collected_bytes.extend(laplacian.flatten().tobytes())
+        Returns:
+            1D uint8 array with high entropy content (empty on failure)
+        """
+        # The per-image noise maps are deterministic, so they may be cached
+        cache_file = self._noise_cache_file(image_path) if self.cache_path else None
+        cached = self._load_cached_noise(cache_file) if cache_file else None
+        
+        if cached is not None:
+            logger.info(f"Processing image: {Path(image_path).name} (cached noise maps)")
+            planes, gray = cached[:-1], cached[-1]
+            num_planes = planes.shape[0]
+        else:
+            # Load image
+            image = self.load_image(image_path)
+            if image is None:
+                logger.error(f"Cannot extract noise from {image_path}")
+                return np.empty(0, dtype=np.uint8)
+            
+            logger.info(f"Processing image: {Path(image_path).name}")
             
-            logger.debug(f"  Channel {i}: Laplacian noise extracted ({len(laplacian.flatten())} bytes)")
+            channels = self.separate_rgb_channels(image)
+            gray = self.convert_to_grayscale(image)
+            num_planes = len(channels) + 2
         
-        # Method 2: Full grayscale processing
-        gray = self.convert_to_grayscale(image)
+        regions = self.sample_random_regions(gray, num_regions=5, region_size=(32, 32))
         
-        # Extract FFT high-frequency components
-        fft_noise = self.extract_fft_high_freq(gray, cutoff_ratio=0.8)
-        collected_bytes.extend(fft_noise.flatten().tobytes())
-        logger.debug(f"  FFT high-freq noise extracted ({len(fft_noise.flatten())} bytes)")
+        # Every contribution is one byte per pixel, so the total size is known
+        # up front: fill one preallocated buffer instead of growing a bytearray
+        pixels = gray.shape[0] * gray.shape[1]
+        total = num_planes * pixels + regions.size
+        collected = np.empty(total, dtype=np.uint8)
+        full_image_noise = collected[:num_planes * pixels].reshape((num_planes,) + gray.shape)
         
-        # Extract pixel differences (gradients)
-        diff_noise = self.extract_pixel_differences(gray)
-        collected_bytes.extend(diff_noise.flatten().tobytes())
-        logger.debug(f"  Gradient noise extracted ({len(diff_noise.flatten())} bytes)")
+        if cached is not None:
+            full_image_noise[...] = planes
+        else:
+            self._extract_full_image_noise(channels, gray, full_image_noise)
+            if cache_file:
+                self._store_cached_noise(cache_file, full_image_noise, gray)
         
         # Method 3: Sample random regions
-        regions = self.sample_random_regions(gray, num_regions=5, region_size=(32, 32))
-        for region in regions:
-            # Extract noise from each region
-            region_noise = self.extract_laplacian_noise(region)
-            collected_bytes.extend(region_noise.flatten().tobytes())
+        # Extract noise from all regions at once
+        collected[num_planes * pixels:] = self.extract_laplacian_noise_batch(regions).reshape(-1)
         
-        logger.debug(f"  Random regions sampled ({len(regions)} regions)")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"  Random regions sampled ({len(regions)} regions)")
         
         # Don't use simple XOR mix - it reduces entropy
         # Instead, return the raw collected bytes
-        logger.info(f"✓ Extracted {len(collected_bytes)} raw noise bytes from {Path(image_path).name}")
+        logger.info(f"✓ Extracted {total} raw noise bytes from {Path(image_path).name}")
+        
+        return collected
+    
+    def _extract_full_image_noise(self, channels: List[np.ndarray], gray: np.ndarray,
+                                  out: np.ndarray) -> None:
+        """
+        Fill `out` with the per-channel Laplacian, FFT and gradient noise maps
+        
+        Args:
+            channels: Image channels from separate_rgb_channels
+            gray: Grayscale image
+            out: (len(channels) + 2, H, W) uint8 array to write into
+        """
+        # Run the full-image methods concurrently (FFT first, it is slowest),
+        # then collect them in a fixed order
+        fft_future = self._executor.submit(self.extract_fft_high_freq, gray, 0.8)
+        diff_future = self._executor.submit(self.extract_pixel_differences, gray)
+        laplacian_futures = [
+            self._executor.submit(self.extract_laplacian_noise,
+                                  self.convert_to_grayscale(channel) if len(channel.shape) > 2 else channel)
+            for channel in channels
+        ]
+        
+        # Skip formatting the per-method log lines at the usual INFO level
+        debug = logger.isEnabledFor(logging.DEBUG)
+        
+        # Method 1: Process each RGB channel separately
+        for i, future in enumerate(laplacian_futures):
+            # Extract Laplacian noise
+            out[i] = future.result()
+            
+            if debug:
+                logger.debug(f"  Channel {i}: Laplacian noise extracted ({out[i].size} bytes)")
         
-        return bytes(collected_bytes)
+        # Method 2: Full grayscale processing
+        
+        # Extract FFT high-frequency components
+        out[-2] = fft_future.result()
+        if debug:
+            logger.debug(f"  FFT high-freq noise extracted ({out[-2].size} bytes)")
+        
+        # Extract pixel differences (gradients)
+        out[-1] = diff_future.result()
+        if debug:
+            logger.debug(f"  Gradient noise extracted ({out[-1].size} bytes)")
+    
+    def _noise_cache_file(self, image_path: str) -> Optional[str]:
+        """Cache file for an image, addressed by the BLAKE3 hash of its contents"""
+        try:
+            hasher = blake3.blake3(max_threads=blake3.blake3.AUTO)
+            hasher.update_mmap(image_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Cannot hash {image_path} for the noise cache: {e}")
+            return None
+        return os.path.join(self.cache_path, f"{hasher.hexdigest()}.npy")
+    
+    def _load_cached_noise(self, cache_file: str) -> Optional[np.ndarray]:
+        """Memory-map cached noise maps (last plane is grayscale), or None on miss"""
+        try:
+            return np.load(cache_file, mmap_mode='r')
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.error(f"Ignoring unreadable noise cache file {cache_file}: {e}")
+            return None
+    
+    def _store_cached_noise(self, cache_file: str, noise: np.ndarray, gray: np.ndarray) -> None:
+        """Write noise maps plus the grayscale image to the cache atomically"""
+        tmp_file = f"{cache_file}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            os.makedirs(self.cache_path, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                np.save(f, np.concatenate([noise, gray[None]]))
+            os.replace(tmp_file, cache_file)
+        except OSError as e:
+            logger.error(f"Failed to write noise cache file {cache_file}: {e}")
+            if os.path.exists(tmp_file):
+                os.remove(tmp_file)
     
     def _xor_mix(self, data: bytearray) -> bytearray:
         """
@@ -292,11 +608,13 @@ class ImagePreprocessor:
         if len(data) < 2:
             return data
         
+        arr = np.frombuffer(data, dtype=np.uint8)
         mixed = bytearray(len(data))
+        out = np.frombuffer(mixed, dtype=np.uint8)
         
         # XOR each byte with the next byte (circular)
-        for i in range(len(data)):
-            mixed[i] = data[i] ^ data[(i + 1) % len(data)]
+        np.bitwise_xor(arr[:-1], arr[1:], out=out[:-1])
+        out[-1] = arr[-1] ^ arr[0]
         
         return mixed
     
@@ -310,19 +628,31 @@ class ImagePreprocessor:
         Returns:
             Combined raw bytes from all images
         """
-        all_noise = bytearray()
-        
-        for path in image_paths:
-            noise = self.extract_noise(path)
-            all_noise.extend(noise)
+        # One allocation for the combined output
+        all_noise = b''.join(self.extract_noise(path) for path in image_paths)
         
         logger.info(f"✓ Batch extracted {len(all_noise)} bytes from {len(image_paths)} images")
         
-        return bytes(all_noise)
+        return all_noise
+
+
+@lru_cache(maxsize=1)
+def get_preprocessor() -> ImagePreprocessor:
+    """
+    Get the shared preprocessor
+    
+    Created on first call rather than on import, so it is configured from
+    the settings in effect when it is first used.
+    """
+    return ImagePreprocessor(cache_path=get_settings().noise_cache_path)
 
 
-# Global preprocessor instance
-preprocessor = ImagePreprocessor()
+def __getattr__(name: str):
+    # Keep `from app.preprocessing import preprocessor` working, but only
+    # construct the preprocessor when it is first used
+    if name == "preprocessor":
+        return get_preprocessor()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 if __name__ == "__main__":
@@ -347,7 +677,7 @@ if __name__ == "__main__":
     print(f"Processing: {Path(test_image).name}")
     print("-" * 60)
     
-    noise_data = preprocessor.extract_noise(test_image)
+    noise_data = get_preprocessor().extract_noise(test_image)
     
     print(f"\nExtracted {len(noise_data):,} noise bytes")
     print(f"First 32 bytes: {noise_data[:32].hex()}")
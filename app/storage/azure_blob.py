@@ -9,7 +9,7 @@ import logging
 from typing import Optional
 from pathlib import Path
 
-from app.config import settings
+from app.config import get_settings
 
 logger = logging.getLogger(__name__)
 
@@ -29,11 +29,13 @@ class AzureBlobStorage:
         if not AZURE_AVAILABLE:
             raise RuntimeError("Azure SDK not available. Install azure-storage-blob & azure-identity.")
 
-        self.container_name = container_name or settings.azure_storage_container
+        self.container_name = container_name or get_settings().azure_storage_container
         self.client = self._build_client()
         self._ensure_container()
 
     def _build_client(self) -> BlobServiceClient:
+        settings = get_settings()
+
         # Prefer connection string if provided
         if settings.azure_storage_connection_string:
             return BlobServiceClient.from_connection_string(settings.azure_storage_connection_string)
@@ -5,21 +5,34 @@ Tests the full pipeline from image ingestion to API serving
 """
 
 import sys
+import argparse
 import asyncio
 import base64
 from pathlib import Path
+from typing import Optional
 
 # Add parent to path
 sys.path.insert(0, str(Path(__file__).parent))
 
-from app.ingestion import ingestion_manager
-from app.preprocessing import preprocessor
+from app.config import get_settings
+from app.ingestion import get_ingestion_manager
+from app.preprocessing import get_preprocessor
 from app.entropy import hasher, validator
+from app.entropy.validation import mean_result
 from app.entropy.pool import entropy_pool
 
 
-async def test_full_pipeline():
-    """Test complete entropy generation pipeline"""
+async def test_full_pipeline(verify: bool = False, block_size: Optional[int] = None):
+    """
+    Test complete entropy generation pipeline
+    
+    Args:
+        verify: Re-validate entropy retrieved from the pool (blocks are
+            already validated when they are added)
+        block_size: Entropy block size in bytes (ENTROPY_BLOCK_SIZE if None)
+    """
+    if block_size is None:
+        block_size = get_settings().entropy_block_size
     
     print("=" * 70)
     print(" Space Entropy Generator - End-to-End Test")
@@ -28,7 +41,7 @@ async def test_full_pipeline():
     
     # Step 1: Check Redis connection
     print("1. Testing Redis connection...")
-    if not entropy_pool.is_connected():
+    if not await entropy_pool.connect():
         print("   ✗ Redis not connected!")
         print("   Start Redis with: docker-compose up -d redis")
         return 1
@@ -37,36 +50,36 @@ async def test_full_pipeline():
     
     # Step 2: Fetch images
     print("2. Fetching space images...")
-    images = await ingestion_manager.fetch_images()
+    images = await get_ingestion_manager().fetch_images()
     if not images:
         print("   ✗ No images fetched")
         return 1
     print(f"   ✓ Fetched {len(images)} images")
     for img in images:
-        print(f"     - {Path(img['path']).name} ({img['size']:,} bytes)")
+        print(f"     - {img['name']} ({img['size']:,} bytes)")
     print()
     
-    # Step 3: Extract noise from first image
-    test_image = images[0]['path']
-    print(f"3. Extracting noise from {Path(test_image).name}...")
-    raw_noise = preprocessor.extract_noise(test_image)
+    # Step 3: Extract noise from first image (the only one used below)
+    test_image_name = images[0]['name']
+    print(f"3. Extracting noise from {test_image_name}...")
+    raw_noise = await asyncio.to_thread(get_preprocessor().extract_noise, images[0]['path'])
     print(f"   ✓ Extracted {len(raw_noise):,} bytes of raw noise")
     print()
     
     # Step 4: Hash into entropy blocks
     print("4. Hashing into entropy blocks...")
-    entropy_blocks = hasher.process_image_noise(raw_noise, block_size=4096)
+    entropy_blocks = hasher.process_image_noise(raw_noise, block_size=block_size)
     print(f"   ✓ Generated {len(entropy_blocks)} entropy blocks")
     print()
     
-    # Step 5: Validate entropy quality
+    # Step 5: Validate entropy quality (once; step 6 reuses the results)
     print("5. Validating entropy quality...")
+    results = validator.validate_many(entropy_blocks)
     passed = 0
     failed = 0
     sample_results = []
     
-    for i, block in enumerate(entropy_blocks[:10]):  # Test first 10
-        result = validator.validate(block, detailed=True)
+    for result in results[:10]:  # Report on first 10
         if result['passed']:
             passed += 1
             sample_results.append(result)
@@ -76,8 +89,8 @@ async def test_full_pipeline():
     print(f"   ✓ Passed: {passed}/{passed+failed} blocks tested")
     
     if sample_results:
-        avg_shannon = sum(r['shannon_entropy'] for r in sample_results) / len(sample_results)
-        avg_quality = sum(r['quality_score'] for r in sample_results) / len(sample_results)
+        avg_shannon = mean_result(sample_results, 'shannon_entropy')
+        avg_quality = mean_result(sample_results, 'quality_score')
         print(f"   ✓ Avg Shannon entropy: {avg_shannon:.3f} bits/byte")
         print(f"   ✓ Avg quality score: {avg_quality:.3f}")
     print()
@@ -86,16 +99,12 @@ async def test_full_pipeline():
     print("6. Adding entropy to pool...")
     await entropy_pool.clear_pool()  # Clear for testing
     
-    added = 0
-    for block in entropy_blocks:
-        result = validator.validate(block)
+    source_info = {'source': test_image_name}
+    valid = []
+    for block, result in zip(entropy_blocks, results):
         if result['passed']:
-            await entropy_pool.add_entropy(
-                block,
-                result['quality_score'],
-                {'source': Path(test_image).name}
-            )
-            added += 1
+            valid.append((block, result['quality_score'], source_info))
+    added = len(await entropy_pool.add_entropy_many(valid))
     
     print(f"   ✓ Added {added} high-quality blocks to pool")
     print()
@@ -115,12 +124,15 @@ async def test_full_pipeline():
     
     for size in test_sizes:
         entropy = await entropy_pool.get_entropy(size)
-        if entropy:
-            # Quick validation of retrieved entropy
+        if entropy and verify:
+            # Optional re-validation of retrieved entropy
             result = validator.validate(entropy)
             status = "✓ PASS" if result['passed'] else "✗ FAIL"
             print(f"   {status} {size} bytes - Shannon: {result['shannon_entropy']:.3f}, Quality: {result['quality_score']:.3f}")
             print(f"        Sample: {entropy[:16].hex()}...")
+        elif entropy:
+            print(f"   ✓ Retrieved {size} bytes")
+            print(f"        Sample: {entropy[:16].hex()}...")
         else:
             print(f"   ✗ Failed to retrieve {size} bytes")
     
@@ -149,9 +161,23 @@ async def test_full_pipeline():
     print("🎉 All tests passed! The system is operational.")
     print()
     
+    await entropy_pool.close()
     return 0
 
 
 if __name__ == "__main__":
-    exit_code = asyncio.run(test_full_pipeline())
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--verify", action="store_true",
+                        help="re-validate entropy retrieved from the pool")
+    parser.add_argument("--block-size", type=int, default=None,
+                        help="entropy block size in bytes (default: ENTROPY_BLOCK_SIZE)")
+    args = parser.parse_args()
+    
+    # Fail fast, before starting the event loop, if Redis is down
+    if not entropy_pool.ping_sync():
+        print("✗ Redis not connected!")
+        print("  Start Redis with: docker-compose up -d redis")
+        sys.exit(1)
+    
+    exit_code = asyncio.run(test_full_pipeline(verify=args.verify, block_size=args.block_size))
     sys.exit(exit_code)
@@ -0,0 +1,69 @@
+"""Tests for entropy hashing module"""
+
+import os
+from unittest import mock
+
+import blake3
+import numpy as np
+import pytest
+from app.entropy.hashing import EntropyHasher
+
+# Fixed clock, so block hashes are reproducible
+TIMESTAMP_NS = 1_700_000_000_123_456_789
+
+
+def _reference_chain(raw_data, block_size, previous_hash=bytes(32)):
+    """Sequential chunk -> chain -> extend reference, returning (blocks, last hash)"""
+    chunk_size = max(block_size, 1024)
+    timestamp = (TIMESTAMP_NS // 1000).to_bytes(8, 'big')
+    blocks = []
+    for i in range(len(raw_data) // chunk_size):
+        digest = blake3.blake3(raw_data[i * chunk_size:(i + 1) * chunk_size]).digest()
+        previous_hash = blake3.blake3(previous_hash + digest + timestamp).digest()
+        blocks.append(blake3.blake3(previous_hash).digest(length=block_size))
+    return blocks, previous_hash
+
+
+@pytest.fixture
+def hasher():
+    # Several workers, so chunks are split across parallel batches
+    return EntropyHasher(max_workers=4)
+
+
+@pytest.fixture(autouse=True)
+def fixed_clock():
+    with mock.patch('time.time_ns', return_value=TIMESTAMP_NS):
+        yield
+
+
+def test_blocks_match_sequential_chain(hasher):
+    """Parallel chunk hashing keeps block order and the chain intact"""
+    raw = os.urandom(37 * 4096 + 100)
+    blocks, last_hash = _reference_chain(raw, 4096)
+    assert hasher.extract_entropy_blocks(raw, 4096) == blocks
+    assert hasher.previous_hash == last_hash
+
+
+def test_array_matches_blocks():
+    """extract_entropy_array returns the same rows as extract_entropy_blocks"""
+    raw = os.urandom(23 * 2048)
+    blocks = EntropyHasher(max_workers=4).extract_entropy_blocks(raw, 2048)
+    array = EntropyHasher(max_workers=4).extract_entropy_array(raw, 2048)
+    assert array.shape == (23, 2048) and array.dtype == np.uint8
+    assert [row.tobytes() for row in array] == blocks
+    assert blocks == _reference_chain(raw, 2048)[0]
+
+
+def test_chain_continues_across_calls(hasher):
+    """Each call chains onto the last block of the previous one"""
+    first, second = os.urandom(8 * 1024), os.urandom(8 * 1024)
+    hasher.extract_entropy_blocks(first, 1024)
+    _, last_hash = _reference_chain(first, 1024)
+    assert hasher.extract_entropy_array(second, 1024).tobytes() == b''.join(
+        _reference_chain(second, 1024, previous_hash=last_hash)[0])
+
+
+def test_empty_input(hasher):
+    """No raw data yields no blocks"""
+    assert hasher.extract_entropy_blocks(b'', 4096) == []
+    assert hasher.extract_entropy_array(b'', 4096).shape == (0, 4096)
@@ -2,10 +2,17 @@
 
 import pytest
 import asyncio
+import httpx
 from pathlib import Path
 from app.ingestion.fetch_images import ImageIngestionManager, NASASDOSource
 
 
+@pytest.fixture(scope="session")
+def manager():
+    """One ingestion manager shared by the tests that don't modify it"""
+    return ImageIngestionManager()
+
+
 @pytest.mark.asyncio
 async def test_nasa_sdo_source_initialization():
     """Test NASA SDO source initialization"""
@@ -15,18 +22,15 @@ async def test_nasa_sdo_source_initialization():
 
 
 @pytest.mark.asyncio
-async def test_ingestion_manager_initialization():
+async def test_ingestion_manager_initialization(manager):
     """Test ingestion manager initialization"""
-    manager = ImageIngestionManager()
     assert len(manager.sources) > 0
     assert Path(manager.storage_path).exists() or True  # Will be created on first use
 
 
 @pytest.mark.asyncio
-async def test_fetch_images():
+async def test_fetch_images(manager):
     """Test fetching images from NASA SDO"""
-    manager = ImageIngestionManager()
-    
     # This test requires internet connection and may take time
     # In a real test suite, you'd mock the HTTP requests
     try:
@@ -39,10 +43,45 @@ async def test_fetch_images():
             assert 'timestamp' in images[0]
     except Exception as e:
         pytest.skip(f"Could not fetch images (network issue): {e}")
+    finally:
+        # The HTTP client is bound to this test's event loop
+        await manager.aclose()
 
 
-def test_get_stored_images():
+def test_get_stored_images(manager):
     """Test getting list of stored images"""
-    manager = ImageIngestionManager()
     images = manager.get_stored_images()
     assert isinstance(images, list)
+
+
+def test_get_stored_images_sees_new_files(tmp_path):
+    """Cached listing is refreshed when the directory changes"""
+    manager = ImageIngestionManager()
+    manager.storage_path = str(tmp_path)
+    assert manager.get_stored_images() == []
+    
+    (tmp_path / "sdo_test.jpg").write_bytes(b"\xff\xd8")
+    assert manager.get_stored_images() == [str(tmp_path / "sdo_test.jpg")]
+
+
+@pytest.mark.asyncio
+async def test_fetch_image_writes_complete_files_only(tmp_path):
+    """Downloads land at save_path only once complete; failures leave nothing"""
+    body = b"\xff\xd8" + bytes(200_000)
+    
+    def handler(request):
+        if request.url.path == "/missing.jpg":
+            return httpx.Response(404)
+        return httpx.Response(200, content=body)
+    
+    source = NASASDOSource()
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        save_path = str(tmp_path / "sdo_ok.jpg")
+        path, size, _ = await source.fetch_image("http://sdo/ok.jpg", save_path, client=client)
+        assert path == save_path and size == len(body)
+        assert Path(save_path).read_bytes() == body
+        
+        failed = str(tmp_path / "sdo_missing.jpg")
+        assert await source.fetch_image("http://sdo/missing.jpg", failed, client=client) is None
+    
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["sdo_ok.jpg"]
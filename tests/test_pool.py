@@ -0,0 +1,77 @@
+"""Tests for the Redis-backed entropy pool"""
+
+import os
+
+import fakeredis.aioredis
+import pytest
+import pytest_asyncio
+from app.entropy.pool import EntropyPool
+
+
+@pytest_asyncio.fixture
+async def pool():
+    pool = EntropyPool()
+    pool.redis_client = fakeredis.aioredis.FakeRedis()
+    yield pool
+    await pool.redis_client.aclose()
+
+
+@pytest.mark.asyncio
+async def test_get_entropy_sizes_claims_from_stored_blocks(pool):
+    """Blocks larger than the configured size are not claimed and discarded"""
+    await pool.add_entropy_many([(os.urandom(16384), 0.9, None) for _ in range(3)])
+    
+    assert len(await pool.get_entropy(10240)) == 10240
+    assert await pool.redis_client.scard(pool.index_key) == 2
+
+
+@pytest.mark.asyncio
+async def test_add_get_stats_round_trip(pool):
+    """Blocks added in one batch are served once, byte-exact, and counted"""
+    blocks = [os.urandom(4096) for _ in range(4)]
+    ids = await pool.add_entropy_many([(block, 0.8, {'source': 'test'}) for block in blocks])
+    assert len(set(ids)) == 4
+    
+    stats = await pool.get_stats()
+    assert stats['available_blocks'] == 4
+    assert stats['available_bytes'] == 4 * 4096
+    assert stats['blocks_added'] == 4
+    assert stats['average_quality'] == pytest.approx(0.8, abs=1 / 255)
+    
+    entropy = await pool.get_entropy(5000)
+    assert len(entropy) == 5000
+    assert entropy[:4096] in blocks
+    
+    # Two blocks were consumed, the second only partly
+    stats = await pool.get_stats()
+    assert stats['available_blocks'] == 2
+    assert stats['bytes_served'] == 5000
+    assert stats['requests_served'] == 1
+    
+    # Remaining entropy is never a repeat of what was served
+    rest = await pool.get_entropy(10000)
+    assert len(rest) == 2 * 4096
+    assert entropy[:4096] not in (rest[:4096], rest[4096:])
+    assert await pool.get_entropy(1) is None
+
+
+@pytest.mark.asyncio
+async def test_add_entropy_many_empty(pool):
+    """An empty batch writes nothing"""
+    assert await pool.add_entropy_many([]) == []
+    assert (await pool.get_stats())['available_blocks'] == 0
+
+
+@pytest.mark.asyncio
+async def test_iter_entropy_counts_blocks_when_claimed(pool):
+    """A stream abandoned after its first block still records what it consumed"""
+    await pool.add_entropy_many([(os.urandom(4096), 0.9, None) for _ in range(3)])
+    
+    stream = pool.iter_entropy(10240)
+    assert len(await stream.__anext__()) == 4096
+    await stream.aclose()
+    
+    stats = await pool.get_stats()
+    assert stats['bytes_served'] == 4096
+    assert stats['requests_served'] == 1
+    assert stats['available_blocks'] == 2
@@ -0,0 +1,127 @@
+"""Tests for image preprocessing module"""
+
+import os
+from unittest import mock
+
+import cv2
+import numpy as np
+import pytest
+from app.preprocessing.noise_extraction import ImagePreprocessor
+
+
+@pytest.fixture
+def preprocessor():
+    return ImagePreprocessor()
+
+
+def _reference_laplacian(image):
+    """Original OpenCV/float64 Laplacian noise pipeline"""
+    combined = np.abs(cv2.Laplacian(image, cv2.CV_64F)) + image.astype(np.float64) * 0.3
+    if combined.max() > combined.min():
+        return ((combined - combined.min()) / (combined.max() - combined.min()) * 255).astype(np.uint8)
+    return combined.astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(1, 1), (2, 3), (32, 32), (101, 67)])
+def test_laplacian_noise_matches_opencv(preprocessor, shape):
+    """Fused Laplacian kernel reproduces the OpenCV pipeline"""
+    image = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    np.testing.assert_array_equal(preprocessor.extract_laplacian_noise(image), _reference_laplacian(image))
+
+
+def test_laplacian_noise_constant_image(preprocessor):
+    """Flat images don't divide by zero"""
+    image = np.full((16, 16), 7, dtype=np.uint8)
+    np.testing.assert_array_equal(preprocessor.extract_laplacian_noise(image), _reference_laplacian(image))
+
+
+def _reference_fft_high_freq(image, cutoff_ratio):
+    """Original full-spectrum fft2/fftshift high-pass pipeline"""
+    rows, cols = image.shape
+    crow, ccol = rows // 2, cols // 2
+    radius = int(min(crow, ccol) * (1 - cutoff_ratio))
+    y, x = np.ogrid[:rows, :cols]
+    mask = ((x - ccol)**2 + (y - crow)**2 > radius**2).astype(np.uint8)
+    img_back = np.abs(np.fft.ifft2(np.fft.ifftshift(np.fft.fftshift(np.fft.fft2(image)) * mask)))
+    return (img_back / img_back.max() * 255).astype(np.uint8)
+
+
+@pytest.mark.parametrize("shape", [(64, 64), (75, 120)])
+@pytest.mark.parametrize("cutoff_ratio", [0.2, 0.8])
+def test_fft_high_freq_matches_full_spectrum(preprocessor, shape, cutoff_ratio):
+    """Half-spectrum high-pass filter reproduces the full fft2 pipeline"""
+    image = np.random.default_rng(0).integers(0, 256, shape, dtype=np.uint8)
+    np.testing.assert_array_equal(
+        preprocessor.extract_fft_high_freq(image, cutoff_ratio),
+        _reference_fft_high_freq(image, cutoff_ratio)
+    )
+
+
+def test_pixel_differences_matches_float64_sobel(preprocessor):
+    """int16 Sobel + fused magnitude reproduces the float64 pipeline"""
+    image = np.random.default_rng(0).integers(0, 256, (90, 70), dtype=np.uint8)
+    grad_x = cv2.Sobel(image, cv2.CV_64F, 1, 0, ksize=3)
+    grad_y = cv2.Sobel(image, cv2.CV_64F, 0, 1, ksize=3)
+    gradient = np.sqrt(grad_x**2 + grad_y**2)
+    expected = (gradient / gradient.max() * 255).astype(np.uint8)
+    np.testing.assert_array_equal(preprocessor.extract_pixel_differences(image), expected)
+
+
+def test_laplacian_noise_channel_views(preprocessor):
+    """Strided channel views match exactly, including the 255 maximum"""
+    rng = np.random.default_rng(5)
+    for _ in range(50):
+        image = rng.integers(0, 256, (int(rng.integers(1, 40)), int(rng.integers(1, 40)), 3), dtype=np.uint8)
+        for c in range(3):
+            channel = image[:, :, c]
+            np.testing.assert_array_equal(preprocessor.extract_laplacian_noise(channel), _reference_laplacian(channel))
+
+
+def test_extract_noise_size(preprocessor, tmp_path):
+    """3 channel + FFT + gradient maps plus 5 sampled 32x32 regions"""
+    image = np.random.default_rng(0).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, image)
+    noise = preprocessor.extract_noise(path)
+    assert len(noise) == 5 * 60 * 80 + 5 * 32 * 32
+
+
+def test_sample_random_regions_stacked(preprocessor):
+    """Regions come back as one contiguous (k, h, w) array of real windows"""
+    image = np.random.default_rng(0).integers(0, 256, (100, 120), dtype=np.uint8)
+    regions = preprocessor.sample_random_regions(image, num_regions=5, region_size=(32, 16))
+    assert regions.shape == (5, 32, 16)
+    assert regions.flags['C_CONTIGUOUS']
+    assert preprocessor.sample_random_regions(image, region_size=(200, 200)).shape[0] == 0
+    
+    noise = preprocessor.extract_laplacian_noise_batch(regions)
+    for region, region_noise in zip(regions, noise):
+        np.testing.assert_array_equal(region_noise, _reference_laplacian(region))
+
+
+def test_extract_noise_cache(tmp_path):
+    """A warm noise cache yields the same bytes as a cold extraction"""
+    image = np.random.default_rng(1).integers(0, 256, (60, 80, 3), dtype=np.uint8)
+    path = str(tmp_path / "image.png")
+    cv2.imwrite(path, image)
+    cached = ImagePreprocessor(cache_path=str(tmp_path / "cache"))
+    with mock.patch('time.time', return_value=123.0):
+        expected = ImagePreprocessor().extract_noise(path)
+        assert cached.extract_noise(path) == expected
+        assert len(os.listdir(tmp_path / "cache")) == 1
+        assert cached.extract_noise(path) == expected
+
+
+def test_extract_noise_batch(tmp_path):
+    """Batch extraction concatenates each image's noise in input order"""
+    rng = np.random.default_rng(2)
+    paths = []
+    for i in range(2):
+        path = str(tmp_path / f"image{i}.png")
+        cv2.imwrite(path, rng.integers(0, 256, (40, 50, 3), dtype=np.uint8))
+        paths.append(path)
+    preprocessor = ImagePreprocessor()
+    with mock.patch('time.time', return_value=123.0):
+        noise = preprocessor.extract_noise_batch(paths)
+        assert noise == b''.join(preprocessor.extract_noise(path) for path in paths)
+    assert len(noise) == 2 * (5 * 40 * 50 + 5 * 32 * 32)
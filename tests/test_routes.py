@@ -0,0 +1,91 @@
+"""Tests for the entropy API routes"""
+
+import base64
+import os
+from contextlib import asynccontextmanager
+
+import fakeredis.aioredis
+import pytest
+from fastapi.testclient import TestClient
+from app.entropy.pool import entropy_pool
+from app.main import app
+
+
+@asynccontextmanager
+async def _no_lifespan(app):
+    # Skip Redis connection and the background ingestion/generation tasks
+    yield
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(app.router, "lifespan_context", _no_lifespan)
+    monkeypatch.setattr(entropy_pool, "redis_client", fakeredis.aioredis.FakeRedis())
+    with TestClient(app) as client:
+        yield client
+
+
+def _fill_pool(client, blocks):
+    # Seed on the client's event loop, which the fake Redis connection binds to
+    client.portal.call(entropy_pool.add_entropy_many, [(block, 0.9, None) for block in blocks])
+
+
+def test_random_empty_pool(client):
+    """An empty pool is reported as 503"""
+    assert client.get("/api/v1/random/16").status_code == 503
+    assert client.get("/api/v1/random/16/raw").status_code == 503
+
+
+def test_raw_stream(client):
+    """/random/{n}/raw streams exactly n bytes across blocks"""
+    blocks = [os.urandom(4096) for _ in range(3)]
+    _fill_pool(client, blocks)
+    
+    response = client.get("/api/v1/random/10000/raw")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert len(response.content) == 10000
+    
+    # Every byte came from a distinct stored block, each used once
+    chunks = [response.content[i:i + 4096] for i in range(0, 10000, 4096)]
+    assert all(any(block.startswith(chunk) for block in blocks) for chunk in chunks)
+    assert client.get("/api/v1/stats").json()["available_blocks"] == 0
+
+
+def test_random_base64(client):
+    """/random/{n} returns n base64-encoded bytes in a JSON envelope"""
+    blocks = [os.urandom(4096) for _ in range(2)]
+    _fill_pool(client, blocks)
+    
+    response = client.get("/api/v1/random/4000")
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/json"
+    body = response.json()
+    assert body["length"] == 4000 and body["format"] == "base64"
+    assert base64.b64decode(body["bytes"]) in (blocks[0][:4000], blocks[1][:4000])
+
+
+def test_random_hex_and_raw_formats(client):
+    """The format query parameter selects hex or raw output"""
+    _fill_pool(client, [os.urandom(4096) for _ in range(2)])
+    
+    body = client.get("/api/v1/random/16?format=hex").json()
+    assert body["format"] == "hex" and len(bytes.fromhex(body["bytes"])) == 16
+    
+    response = client.get("/api/v1/random/32?format=raw")
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert len(response.content) == 32
+
+
+def test_random_skips_gzip(client):
+    """Random bytes are sent uncompressed; other large responses are gzipped"""
+    _fill_pool(client, [os.urandom(4096) for _ in range(4)])
+    gzip = {"Accept-Encoding": "gzip"}
+    
+    # Both are large enough for GZip, but random bytes do not compress
+    for path in ("/api/v1/random/4000", "/api/v1/random/10000/raw"):
+        response = client.get(path, headers=gzip)
+        assert response.status_code == 200
+        assert "content-encoding" not in response.headers
+    
+    assert client.get("/api/v1/", headers=gzip).headers["content-encoding"] == "gzip"
@@ -0,0 +1,89 @@
+"""Tests for entropy validation module"""
+
+import os
+import numpy as np
+import pytest
+from app.entropy.validation import EntropyValidator
+
+
+@pytest.fixture
+def validator():
+    return EntropyValidator()
+
+
+def test_random_data_passes(validator):
+    """OS random data should pass validation"""
+    result = validator.validate(os.urandom(4096))
+    assert result['passed']
+    assert result['shannon_entropy'] > 7.9
+
+
+def test_zeros_fail(validator):
+    """Constant data has no entropy"""
+    result = validator.validate(bytes(4096))
+    assert not result['passed']
+    assert result['shannon_entropy'] == 0.0
+
+
+def test_repeating_pattern_fails(validator):
+    """A byte counter is uniform but not random"""
+    pattern = bytes(i % 256 for i in range(4096))
+    result = validator.validate(pattern, detailed=True)
+    assert not result['passed']
+    assert result['shannon_entropy'] == 8.0
+
+
+def test_validate_matches_individual_tests(validator):
+    """Shared-pass scores in validate() match the standalone test methods"""
+    data = os.urandom(2048) + bytes(2048)
+    result = validator.validate(data, detailed=True)
+    assert result['shannon_entropy'] == round(validator.calculate_shannon_entropy(data), 4)
+    assert result['chi_square_score'] == round(validator.chi_square_test(data), 4)
+    assert result['runs_test_score'] == round(validator.runs_test(data), 4)
+    assert result['autocorrelation_score'] == round(validator.autocorrelation_test(data), 4)
+    assert result['bit_entropy_score'] == round(validator.bit_entropy_test(data), 4)
+
+
+def test_empty_data(validator):
+    """Empty input is rejected"""
+    result = validator.validate(b'')
+    assert not result['passed']
+    assert result['quality_score'] == 0.0
+
+
+def test_batch_validate_filters_blocks(validator):
+    """batch_validate keeps passing blocks and returns every result"""
+    good = [os.urandom(4096) for _ in range(8)]
+    valid, results = validator.batch_validate(good + [bytes(4096)])
+    assert valid == good
+    assert len(results) == 9 and not results[-1]['passed']
+
+
+def test_low_entropy_short_circuits(validator):
+    """Blocks failing the Shannon threshold skip the remaining tests"""
+    result = validator.validate(bytes(4096))
+    assert not result['passed']
+    assert 'chi_square_score' not in result
+    assert 'chi_square_score' in validator.validate(bytes(4096), detailed=True)
+
+
+def test_batch_validate_contiguous_matches_validate(validator):
+    """Row-batched validation agrees with validating each block"""
+    blocks = [os.urandom(4096), bytes(4096), os.urandom(2048) + bytes(2048),
+              bytes(i % 256 for i in range(4096))]
+    arr2d = np.frombuffer(b''.join(blocks), dtype=np.uint8).reshape(len(blocks), 4096)
+    batched = validator.batch_validate_contiguous(arr2d)
+    for block, result in zip(blocks, batched):
+        expected = validator.validate(block)
+        assert result['passed'] == expected['passed']
+        assert result['shannon_entropy'] == expected['shannon_entropy']
+        assert result['quality_score'] == pytest.approx(expected['quality_score'], abs=1e-4)
+
+
+def test_validate_many(validator):
+    """validate_many batches equal-size blocks and handles mixed sizes"""
+    blocks = [os.urandom(4096), bytes(4096)]
+    assert [r['passed'] for r in validator.validate_many(blocks)] == [True, False]
+    mixed = validator.validate_many(blocks + [os.urandom(100)])
+    assert len(mixed) == 3 and mixed[2]['data_size'] == 100
+    assert validator.validate_many([]) == []